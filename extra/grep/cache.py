@@ -0,0 +1,75 @@
+"""Search result cache for the File Content Searcher."""
+
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    Bounded LRU of finished searches keyed by (root, query options).
+
+    Every entry remembers the tree generation it was computed at and is
+    only served while the generation is unchanged. Plain substring
+    searches can also be refined: a query containing an earlier query's
+    text can only match files the earlier one matched.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, root, query, generation):
+        """Return cached matches for an identical search, or None."""
+        key = (root, query.key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != generation:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, root, query, generation, matches):
+        if self.max_entries <= 0:
+            return
+        key = (root, query.key)
+        with self._lock:
+            self._entries[key] = (generation, matches)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def refinement_base(self, root, query, generation):
+        """
+        Return the paths matched by the narrowest cached query that the new
+        query refines, or None if a full scan is needed.
+        """
+        if query.regex or query.whole_word:
+            return None
+
+        def fold(text):
+            return text.lower() if query.ignore_case else text
+
+        needle = fold(query.text)
+        best = None
+        with self._lock:
+            for (cached_root, key), (cached_gen, matches) in self._entries.items():
+                text, regex, ignore_case, whole_word = key
+                if (
+                    cached_root != root
+                    or cached_gen != generation
+                    or (regex, ignore_case, whole_word)
+                    != (query.regex, query.ignore_case, query.whole_word)
+                    or fold(text) not in needle
+                ):
+                    continue
+                if best is None or len(matches) < len(best):
+                    best = matches
+        return None if best is None else [m.path for m in best]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
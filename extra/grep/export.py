@@ -0,0 +1,181 @@
+"""Markdown export helpers for File Content Searcher results."""
+
+import mmap
+import os
+import threading
+import time
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _context_regions(mm, lines, context_lines):
+    """
+    Return merged (first_line, start, end) byte regions covering every
+    matching line plus context_lines of surrounding context.
+    """
+    regions = []
+    size = len(mm)
+    for line_no, offset in lines:
+        start = mm.rfind(b"\n", 0, offset) + 1
+        first_line = line_no
+        for _ in range(context_lines):
+            if start == 0:
+                break
+            start = mm.rfind(b"\n", 0, start - 1) + 1
+            first_line -= 1
+
+        end = offset
+        for _ in range(context_lines + 1):
+            end = mm.find(b"\n", end)
+            if end == -1:
+                end = size
+                break
+            end += 1
+
+        if regions and start <= regions[-1][2]:
+            regions[-1] = (regions[-1][0], regions[-1][1], max(end, regions[-1][2]))
+        else:
+            regions.append((first_line, start, end))
+    return regions
+
+
+class MarkdownExport:
+    """
+    Streams search results into a Markdown file.
+
+    Files are copied in fixed-size chunks (or as context snippets) straight
+    from disk to the output, so memory use does not grow with the export.
+    Each file is capped at max_file_bytes and the whole export at
+    max_total_bytes; anything cut off is marked in the output. run() is
+    meant for a worker thread and honours cancel().
+    """
+
+    def __init__(
+        self,
+        out_path,
+        matches,
+        title,
+        source,
+        languages,
+        mode="snippets",
+        context_lines=3,
+        max_file_bytes=256 * 1024,
+        max_total_bytes=8 * 1024 * 1024,
+    ):
+        self.out_path = out_path
+        self.matches = matches
+        self.title = title
+        self.source = source
+        self.languages = languages
+        self.mode = mode
+        self.context_lines = context_lines
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+        self.written = 0
+        self.truncated_files = 0
+        self.exported_files = 0
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _write(self, out, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        out.write(data)
+        self.written += len(data)
+
+    def _copy_full(self, out, path, limit):
+        """Copy up to limit bytes of path in chunks. Returns True if truncated."""
+        copied = 0
+        with open(path, "rb") as src:
+            while copied < limit:
+                chunk = src.read(min(CHUNK_SIZE, limit - copied))
+                if not chunk:
+                    break
+                self._write(out, chunk)
+                copied += len(chunk)
+            return bool(src.read(1))
+
+    def _write_snippets(self, out, match, lang, limit):
+        """Write the matching regions of one file. Returns True if truncated."""
+        copied = 0
+        with open(match.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for first_line, start, end in _context_regions(
+                    mm, match.lines, self.context_lines
+                ):
+                    if copied >= limit:
+                        return True
+                    clipped = end - start > limit - copied
+                    if clipped:
+                        end = start + limit - copied
+                    block = mm[start:end].rstrip(b"\n")
+                    last_line = first_line + block.count(b"\n")
+                    self._write(out, f"Lines {first_line}-{last_line}:\n\n```{lang}\n")
+                    self._write(out, block)
+                    if clipped:
+                        self._write(out, "\n\u2026 truncated")
+                    self._write(out, b"\n```\n\n")
+                    if clipped:
+                        return True
+                    copied += end - start
+        return False
+
+    def run(self, on_progress=None, progress_interval=0.1):
+        """
+        Write the export. on_progress(done, total, written_bytes) is called
+        at most once per progress_interval seconds. Returns False if the
+        export was cancelled.
+        """
+        total = len(self.matches)
+        last_report = time.monotonic()
+        with open(self.out_path, "wb") as out:
+            self._write(out, f"# Search Results for: {self.title}\n")
+            self._write(out, f"**Source Folder:** `{self.source}`\n\n")
+
+            for done, match in enumerate(self.matches):
+                if self.cancelled:
+                    return False
+                budget = self.max_total_bytes - self.written
+                if budget <= 0:
+                    self._write(
+                        out,
+                        f"_Export stopped at the {self.max_total_bytes:,} byte limit; "
+                        f"{total - done:,} more files omitted._\n",
+                    )
+                    break
+
+                _, ext = os.path.splitext(match.path)
+                lang = self.languages.get(ext.lower(), "")
+                limit = min(self.max_file_bytes, budget)
+                self._write(out, f"## File: `{match.path}`\n\n")
+                try:
+                    if self.mode == "snippets":
+                        truncated = self._write_snippets(out, match, lang, limit)
+                    else:
+                        self._write(out, f"```{lang}\n")
+                        truncated = self._copy_full(out, match.path, limit)
+                        self._write(out, "\n```\n\n")
+                except (OSError, ValueError):
+                    self._write(out, "_File could not be read._\n\n")
+                    truncated = False
+
+                if truncated:
+                    self.truncated_files += 1
+                    self._write(out, f"_Truncated after {limit:,} bytes._\n\n")
+                self._write(out, "---\n\n")
+                self.exported_files += 1
+
+                now = time.monotonic()
+                if on_progress and now - last_report >= progress_interval:
+                    on_progress(done + 1, total, self.written)
+                    last_report = now
+
+        if on_progress:
+            on_progress(self.exported_files, total, self.written)
+        return True
@@ -0,0 +1,223 @@
+"""Cheap pre-filters deciding which files the searcher looks at."""
+
+import os
+import re
+import threading
+
+IGNORE_FILES = (".gitignore", ".ignore")
+
+# Verdicts are remembered per file identity; the cache is simply reset
+# when it grows past this many entries.
+MAX_CACHED_VERDICTS = 500_000
+
+# Files larger than this are skipped as generated or vendored. The trigram
+# index uses the same limit; a file it indexes is always one that is scanned.
+MAX_FILE_BYTES = 2 * 1024 * 1024
+
+
+def _translate_glob(pattern):
+    """Translate a gitignore glob (without anchoring) into a regex body."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            # A "]" right after "[" belongs to the class.
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1 : end].replace("\\", "\\\\")
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+def parse_ignore_file(path):
+    """
+    Return [(regex, negate, dir_only)] for the rules in a .gitignore-style
+    file. Patterns match paths relative to the file's directory.
+    """
+    rules = []
+    try:
+        with open(path, "r", errors="ignore") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return rules
+
+    for line in lines:
+        # Trailing spaces are dropped unless escaped with a backslash.
+        if line.endswith(" ") and not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        anchored = "/" in line
+        body = _translate_glob(line.lstrip("/"))
+        prefix = "^" if anchored else "(?:^|/)"
+        rules.append((re.compile(f"{prefix}{body}$"), negate, dir_only))
+    return rules
+
+
+class SourceFilter:
+    """
+    Decides which directories are walked and which files are scanned.
+
+    Besides the extension allow-list and ignored directory names, files
+    larger than max_file_bytes or with a NUL byte in their first block are
+    rejected, and .gitignore/.ignore rules can be honored. File verdicts
+    are cached per (device, inode) and revalidated against the mtime and
+    size from the stat the caller already has, so known junk costs no
+    extra system calls.
+    """
+
+    def __init__(
+        self,
+        extensions,
+        ignored_dirs,
+        max_file_bytes=MAX_FILE_BYTES,
+        sniff_bytes=8192,
+        honor_ignore_files=True,
+    ):
+        self.extensions = extensions
+        self.ignored_dirs = ignored_dirs
+        self.max_file_bytes = max_file_bytes
+        self.sniff_bytes = sniff_bytes
+        self.honor_ignore_files = honor_ignore_files
+        self._verdicts = {}
+        self._dir_rules = {}
+        self._lock = threading.Lock()
+
+    def wants_extension(self, name):
+        return os.path.splitext(name)[1].lower() in self.extensions
+
+    def _is_binary(self, path):
+        try:
+            with open(path, "rb") as f:
+                return b"\0" in f.read(self.sniff_bytes)
+        except OSError:
+            return True
+
+    def accept(self, path, st):
+        """Return True if the file described by st is worth scanning."""
+        identity = (st.st_dev, st.st_ino)
+        signature = (st.st_mtime_ns, st.st_size)
+        cached = self._verdicts.get(identity)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        verdict = 0 < st.st_size <= self.max_file_bytes and not self._is_binary(path)
+        with self._lock:
+            if len(self._verdicts) >= MAX_CACHED_VERDICTS:
+                self._verdicts.clear()
+            self._verdicts[identity] = (signature, verdict)
+        return verdict
+
+    def rules_for_dir(self, directory, ignore_stats):
+        """
+        Return the compiled ignore rules defined directly in directory.
+
+        ignore_stats maps ignore file names to the stat results seen while
+        listing the directory; parsed rules are reused until they change.
+        """
+        if not self.honor_ignore_files or not ignore_stats:
+            return ()
+        signature = tuple(
+            (name, ignore_stats[name].st_mtime_ns)
+            for name in IGNORE_FILES
+            if name in ignore_stats
+        )
+        cached = self._dir_rules.get(directory)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        rules = []
+        for name, _ in signature:
+            rules.extend(parse_ignore_file(os.path.join(directory, name)))
+        rules = tuple(rules)
+        with self._lock:
+            self._dir_rules[directory] = (signature, rules)
+        return rules
+
+    def is_ignored(self, path, is_dir, chain):
+        """
+        Apply a chain of (base_dir, rules) from outermost to innermost
+        directory; the last matching rule wins, as in git.
+        """
+        ignored = False
+        for base_dir, rules in chain:
+            rel = os.path.relpath(path, base_dir)
+            for regex, negate, dir_only in rules:
+                if dir_only and not is_dir:
+                    continue
+                if regex.search(rel):
+                    ignored = not negate
+        return ignored
+
+    def _load_dir_rules(self, directory):
+        stats = {}
+        for name in IGNORE_FILES:
+            try:
+                stats[name] = os.stat(os.path.join(directory, name))
+            except OSError:
+                continue
+        return self.rules_for_dir(directory, stats)
+
+    def is_path_excluded(self, root, path, is_dir):
+        """
+        Full check for a single path outside a walk, e.g. from a watcher.
+        Every directory between root and path is checked, so anything inside
+        an ignored directory is excluded too.
+        """
+        rel = os.path.relpath(path, root)
+        if rel.startswith(".."):
+            return True
+        if rel == ".":
+            return False
+
+        parts = rel.split(os.sep)
+        chain = []
+        current = root
+        for i, part in enumerate(parts):
+            if self.honor_ignore_files:
+                rules = self._load_dir_rules(current)
+                if rules:
+                    chain.append((current, rules))
+            current = os.path.join(current, part)
+            part_is_dir = is_dir or i < len(parts) - 1
+            if part_is_dir and part in self.ignored_dirs:
+                return True
+            if self.is_ignored(current, part_is_dir, chain):
+                return True
+        return False
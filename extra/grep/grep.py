@@ -0,0 +1,584 @@
+def get_plugin_metadata(_):
+    """
+    Define the plugin metadata for the File Content Searcher.
+    """
+    return {
+        "id": "org.waypanel.plugin.file_content_searcher",
+        "name": "File Content Searcher",
+        "version": "2.2.0",
+        "enabled": True,
+        "index": 5,
+        "container": "right-panel-center",
+        "description": "Indexed source code search with folder-named Markdown output and persistent path selection.",
+    }
+
+
+def get_plugin_class():
+    """
+    Main plugin class with folder-aware naming, source-restricted search, and persistent state.
+    """
+    import os
+    import re
+    import tempfile
+    import subprocess
+    import threading
+    from src.plugins.core._base import BasePlugin
+    from .cache import ResultCache
+    from .export import MarkdownExport
+    from .filters import SourceFilter
+    from .index import TrigramIndex, index_path_for_root
+    from .matcher import Query
+    from .search import ScanEngine, SearchJob
+    from .watcher import IndexWatcher
+
+    class FileContentSearcher(BasePlugin):
+        def __init__(self, panel_instance):
+            super().__init__(panel_instance)
+            self.search_paths = self.get_plugin_setting_add_hint(
+                ["behavior", "search_paths"],
+                [
+                    os.path.expanduser("~/Git/wayfire"),
+                    os.path.expanduser("~/Documents"),
+                ],
+                "A list of absolute paths available for searching.",
+            )
+            self.last_path = self.get_plugin_setting(
+                ["behavior", "last_selected_path"], ""
+            )
+            self.export_mode = self.get_plugin_setting_add_hint(
+                ["export", "mode"],
+                "snippets",
+                "Markdown export content: 'snippets' (matching lines with context) or 'full' (whole files).",
+            )
+            self.export_context_lines = self.get_plugin_setting_add_hint(
+                ["export", "context_lines"],
+                3,
+                "Lines of context around each match in snippet exports.",
+            )
+            self.export_max_file_bytes = self.get_plugin_setting_add_hint(
+                ["export", "max_file_bytes"],
+                256 * 1024,
+                "Maximum bytes exported per file before it is truncated.",
+            )
+            self.export_max_total_bytes = self.get_plugin_setting_add_hint(
+                ["export", "max_total_bytes"],
+                8 * 1024 * 1024,
+                "Maximum size of the combined Markdown export.",
+            )
+            self._export_job = None
+            self.search_options = {
+                "regex": self.get_plugin_setting(["behavior", "regex"], False),
+                "match_case": self.get_plugin_setting(["behavior", "match_case"], True),
+                "whole_word": self.get_plugin_setting(
+                    ["behavior", "whole_word"], False
+                ),
+            }
+            self.index_enabled = self.get_plugin_setting_add_hint(
+                ["index", "enabled"],
+                True,
+                "Keep an on-disk trigram index of each search path to narrow searches.",
+            )
+            self.max_indexed_bytes = self.get_plugin_setting_add_hint(
+                ["index", "max_indexed_bytes"],
+                2 * 1024 * 1024,
+                "Files larger than this are always scanned instead of indexed. "
+                "Capped at scan.max_file_bytes.",
+            )
+            self.watch_enabled = self.get_plugin_setting_add_hint(
+                ["index", "watch"],
+                True,
+                "Keep indexes fresh by watching search paths for file changes.",
+            )
+            self.watch_debounce_ms = self.get_plugin_setting_add_hint(
+                ["index", "watch_debounce_ms"],
+                750,
+                "Milliseconds to collect file change events before updating the index.",
+            )
+            self.max_watched_dirs = self.get_plugin_setting_add_hint(
+                ["index", "max_watched_dirs"],
+                8192,
+                "Maximum number of directories watched per search path.",
+            )
+            self.scan_engine = ScanEngine(
+                mode=self.get_plugin_setting_add_hint(
+                    ["scan", "engine"],
+                    "auto",
+                    "Parallel scan backend: 'processes' (multi-core), 'threads' "
+                    "(overlaps I/O only), or 'auto' for processes when there is "
+                    "more than one core.",
+                ),
+                workers=self.get_plugin_setting_add_hint(
+                    ["scan", "workers"],
+                    0,
+                    "Number of scan workers; 0 uses one per CPU core.",
+                ),
+                chunk_size=self.get_plugin_setting_add_hint(
+                    ["scan", "chunk_size"],
+                    64,
+                    "Number of files handed to a scan worker at a time.",
+                ),
+                serial_threshold=self.get_plugin_setting_add_hint(
+                    ["scan", "serial_threshold"],
+                    256,
+                    "Searches with fewer candidate files than this are scanned serially.",
+                ),
+            )
+            self.result_cache = ResultCache(
+                self.get_plugin_setting_add_hint(
+                    ["cache", "max_entries"],
+                    32,
+                    "Number of recent searches kept for instant repeats and refinement.",
+                )
+            )
+            self.indexes = {}
+            self.watchers = {}
+            self._index_cancel = threading.Event()
+
+            self.popover_width = 400
+            self.popover_height = 360
+            self.found_files = []
+            self._search_job = None
+
+            self.menu_button = self.gtk.Button()
+            self.menu_button.set_icon_name("system-search-symbolic")
+            self.gtk_helper.add_cursor_effect(self.menu_button)
+            self.popover = None
+
+            self.programming_extensions = {
+                ".py": "python",
+                ".c": "c",
+                ".cpp": "cpp",
+                ".h": "cpp",
+                ".hpp": "cpp",
+                ".js": "javascript",
+                ".ts": "typescript",
+                ".lua": "lua",
+                ".rs": "rust",
+                ".go": "go",
+                ".rb": "ruby",
+                ".php": "php",
+                ".java": "java",
+                ".cs": "csharp",
+                ".sh": "bash",
+                ".vert": "glsl",
+                ".frag": "glsl",
+                ".geom": "glsl",
+                ".comp": "glsl",
+                ".glsl": "glsl",
+                ".ini": "ini",
+                ".conf": "ini",
+                ".md": "markdown",
+            }
+            self.ignored_dirs = {
+                "build",
+                ".git",
+                "__pycache__",
+                "node_modules",
+                ".venv",
+                "target",
+            }
+            self.source_filter = SourceFilter(
+                self.programming_extensions,
+                self.ignored_dirs,
+                max_file_bytes=self.get_plugin_setting_add_hint(
+                    ["scan", "max_file_bytes"],
+                    2 * 1024 * 1024,
+                    "Files larger than this are skipped as generated or vendored.",
+                ),
+                sniff_bytes=self.get_plugin_setting_add_hint(
+                    ["scan", "binary_sniff_bytes"],
+                    8192,
+                    "Files with a NUL byte in this many leading bytes are treated as binary.",
+                ),
+                honor_ignore_files=self.get_plugin_setting_add_hint(
+                    ["scan", "honor_ignore_files"],
+                    True,
+                    "Skip paths matched by .gitignore and .ignore files.",
+                ),
+            )
+
+        def on_start(self):
+            """
+            Initialize UI and signals.
+            """
+            self.main_widget = (self.menu_button, "append")
+            self._setup_popover()
+            self.menu_button.connect("clicked", self._toggle_popover)
+            if self.index_enabled:
+                self._open_indexes()
+                self.run_in_thread(self._sync_indexes)
+
+        def _open_indexes(self):
+            """
+            Open (or create) the persistent trigram index of every search path.
+            """
+            index_dir = os.path.join(
+                self._path_handler.get_data_path(), "file_content_searcher", "index"
+            )
+            for path in self.search_paths:
+                root = os.path.expanduser(path)
+                try:
+                    self.indexes[root] = TrigramIndex(
+                        root,
+                        index_path_for_root(index_dir, root),
+                        min(
+                            self.max_indexed_bytes,
+                            self.source_filter.max_file_bytes,
+                        ),
+                    )
+                except Exception as e:
+                    self.logger.error(f"Could not open index for {root}: {e}")
+
+        def _sync_indexes(self):
+            """
+            Reconcile every index with the tree on disk, then hand the walked
+            directories to a watcher. Runs in a worker thread.
+            """
+            for root, index in list(self.indexes.items()):
+                if self._index_cancel.is_set():
+                    return
+                if not os.path.isdir(root):
+                    continue
+                visited_dirs = []
+                try:
+                    synced = index.sync(
+                        self.source_filter, self._index_cancel, visited_dirs
+                    )
+                except Exception as e:
+                    self.logger.error(f"Indexing {root} failed: {e}")
+                    continue
+                if synced and self.watch_enabled:
+                    self.schedule_in_gtk_thread(
+                        self._start_watcher, root, index, visited_dirs
+                    )
+
+        def _start_watcher(self, root, index, dirs):
+            if self._index_cancel.is_set():
+                return
+            watcher = self.watchers.get(root)
+            if watcher is None:
+                watcher = IndexWatcher(
+                    self, index, self.watch_debounce_ms, self.max_watched_dirs
+                )
+                self.watchers[root] = watcher
+            watcher.watch_dirs(dirs)
+
+        def _setup_popover(self):
+            """
+            Create the search interface with directory selection and persistent state.
+            """
+            self.popover = self.create_popover(
+                parent_widget=self.menu_button,
+                css_class="file-searcher-popover",
+                has_arrow=True,
+                closed_handler=self._on_popover_closed,
+            )
+
+            main_box = self.gtk.Box.new(self.gtk.Orientation.VERTICAL, 10)
+            main_box.set_margin_end(10)
+            main_box.set_size_request(self.popover_width, self.popover_height)
+
+            dir_label = self.gtk.Label.new("Search in:")
+            dir_label.set_halign(self.gtk.Align.START)
+            main_box.append(dir_label)
+
+            self.dir_combo = self.gtk.ComboBoxText()
+            active_index = 0
+            for idx, path in enumerate(self.search_paths):
+                self.dir_combo.append_text(path)
+                if path == self.last_path:
+                    active_index = idx
+
+            if self.search_paths:
+                self.dir_combo.set_active(active_index)
+
+            self.dir_combo.connect("changed", self._on_dir_changed)
+            main_box.append(self.dir_combo)
+
+            self.search_entry = self.gtk.SearchEntry()
+            self.search_entry.set_placeholder_text("Search source code...")
+            self.search_entry.connect("activate", self._on_search_triggered)
+            main_box.append(self.search_entry)
+
+            options_box = self.gtk.Box.new(self.gtk.Orientation.HORIZONTAL, 10)
+            for key, label in (
+                ("regex", "Regex"),
+                ("match_case", "Match case"),
+                ("whole_word", "Whole word"),
+            ):
+                check = self.gtk.CheckButton.new_with_label(label)
+                check.set_active(self.search_options[key])
+                check.connect("toggled", self._on_option_toggled, key)
+                options_box.append(check)
+            main_box.append(options_box)
+
+            self.trigger_button = self.gtk.Button.new_with_label("Search Now")
+            self.trigger_button.add_css_class("suggested-action")
+            self.trigger_button.connect("clicked", self._on_search_triggered)
+            main_box.append(self.trigger_button)
+
+            self.status_label = self.gtk.Label.new("Status: Ready")
+            self.status_label.add_css_class("dim-label")
+            main_box.append(self.status_label)
+
+            self.combine_button = self.gtk.Button.new_with_label(
+                "Combine & Copy Markdown"
+            )
+            self.combine_button.set_sensitive(False)
+            self.combine_button.connect("clicked", self._on_combine_clicked)
+            main_box.append(self.combine_button)
+
+            self.popover.set_child(main_box)
+
+        def _on_dir_changed(self, combo):
+            """
+            Update the persistent setting when the user selects a new directory.
+            """
+            selected = combo.get_active_text()
+            if selected:
+                self.set_plugin_setting(["behavior", "last_selected_path"], selected)
+
+        def _on_option_toggled(self, check, key):
+            """
+            Persist a search mode toggle.
+            """
+            self.search_options[key] = check.get_active()
+            self.set_plugin_setting(["behavior", key], self.search_options[key])
+
+        def _build_query(self, text):
+            return Query(
+                text.encode("utf-8"),
+                regex=self.search_options["regex"],
+                ignore_case=not self.search_options["match_case"],
+                whole_word=self.search_options["whole_word"],
+            )
+
+        def _toggle_popover(self, *_):
+            if self.popover.is_visible():
+                self.popover.popdown()
+            else:
+                self.popover.popup()
+                self.search_entry.grab_focus()
+
+        def _cancel_search(self):
+            """
+            Stop the running search, if any. Late batches from it are ignored.
+            """
+            if self._search_job:
+                self._search_job.cancel()
+                self._search_job = None
+
+        def _on_popover_closed(self, *_):
+            if self._search_job:
+                self._cancel_search()
+                self.status_label.set_text("Status: Search cancelled")
+
+        def _on_search_triggered(self, *_):
+            """
+            Start a recursive grep of the selected folder in a worker thread.
+            """
+            query = self.search_entry.get_text().strip()
+            selected_path = self.dir_combo.get_active_text()
+
+            if not query or not selected_path:
+                return
+
+            self._cancel_search()
+            self.found_files = []
+            self.combine_button.set_sensitive(False)
+            target_dir = os.path.expanduser(selected_path)
+
+            if not os.path.isdir(target_dir):
+                self.status_label.set_text("Error: Directory not found")
+                return
+
+            search_query = self._build_query(query)
+            try:
+                search_query.pattern
+            except re.error as e:
+                self.status_label.set_text(f"Error: Invalid regex ({e})")
+                return
+
+            generation = self._tree_generation(target_dir)
+            cached = None
+            if generation is not None:
+                cached = self.result_cache.get(target_dir, search_query, generation)
+            if cached is not None:
+                self.found_files = list(cached)
+                self.status_label.set_text(
+                    f"Status: Found {len(cached):,} source files (cached)."
+                )
+                self.combine_button.set_sensitive(bool(cached))
+                return
+
+            refine_from = None
+            if generation is not None:
+                refine_from = self.result_cache.refinement_base(
+                    target_dir, search_query, generation
+                )
+            self.status_label.set_text("Status: Searching...")
+            job = SearchJob(
+                target_dir,
+                search_query,
+                self.source_filter,
+                self.indexes.get(target_dir),
+                refine_from,
+            )
+            job.generation = generation
+            self._search_job = job
+            self.run_in_thread(self._run_search, job)
+
+        def _tree_generation(self, root):
+            """
+            Token that changes whenever the tree under root may have changed,
+            or None when no watcher covers the whole tree. Results are only
+            cached and refined while a token is available: a directory mtime
+            does not change when nested files are edited.
+            """
+            watcher = self.watchers.get(root)
+            if watcher and watcher.complete:
+                return ("watch", watcher.generation, watcher.index.generation)
+            return None
+
+        def _run_search(self, job):
+            """
+            Worker-thread body of a search; streams batches to the GTK thread.
+            """
+            try:
+                job.run(
+                    lambda batch, scanned: self.schedule_in_gtk_thread(
+                        self._on_search_progress, job, list(batch), scanned
+                    ),
+                    self.scan_engine,
+                )
+            except Exception as e:
+                self.logger.error(f"Search error: {e}")
+            if self.scan_engine.fallback_reason:
+                self.logger.warning(
+                    f"Scanning with threads, {self.scan_engine.fallback_reason}"
+                )
+                self.scan_engine.fallback_reason = None
+            if not job.cancelled:
+                self.schedule_in_gtk_thread(self._on_search_finished, job)
+
+        def _on_search_progress(self, job, batch, scanned):
+            if job is not self._search_job:
+                return
+            self.found_files.extend(batch)
+            self.status_label.set_text(
+                f"Status: Found {len(self.found_files):,} files, {scanned:,} scanned…"
+            )
+
+        def _on_search_finished(self, job):
+            if job is not self._search_job:
+                return
+            self._search_job = None
+            if job.generation is not None:
+                self.result_cache.put(
+                    job.root, job.query, job.generation, list(job.matches)
+                )
+            count = len(self.found_files)
+            self.status_label.set_text(
+                f"Status: Found {count:,} source files, "
+                f"{sum(len(m.lines) for m in self.found_files):,} matching lines."
+            )
+            self.combine_button.set_sensitive(count > 0)
+
+        def _on_combine_clicked(self, _):
+            """
+            Combines matches into a Markdown file named after the folder. The
+            export streams to disk in a worker thread.
+            """
+            selected_path = self.dir_combo.get_active_text()
+            if not self.found_files or not selected_path or self._export_job:
+                return
+
+            folder_name = os.path.basename(os.path.normpath(selected_path))
+            if not folder_name:
+                folder_name = "root"
+
+            filename = f"{folder_name}.md"
+            job = MarkdownExport(
+                os.path.join(tempfile.gettempdir(), filename),
+                list(self.found_files),
+                self.search_entry.get_text(),
+                selected_path,
+                self.programming_extensions,
+                mode=self.export_mode,
+                context_lines=self.export_context_lines,
+                max_file_bytes=self.export_max_file_bytes,
+                max_total_bytes=self.export_max_total_bytes,
+            )
+            self._export_job = job
+            self.combine_button.set_sensitive(False)
+            self.status_label.set_text("Status: Exporting...")
+            self.run_in_thread(self._run_export, job)
+
+        def _run_export(self, job):
+            """
+            Worker-thread body of an export; copies the result on success.
+            """
+            try:
+                completed = job.run(
+                    lambda done, total, written: self.schedule_in_gtk_thread(
+                        self._on_export_progress, job, done, total, written
+                    )
+                )
+                if completed:
+                    self._wl_copy_uri(job.out_path)
+            except Exception as e:
+                self.logger.error(f"Combine error: {e}")
+                completed = False
+            self.schedule_in_gtk_thread(self._on_export_finished, job, completed)
+
+        def _on_export_progress(self, job, done, total, written):
+            if job is not self._export_job:
+                return
+            self.status_label.set_text(
+                f"Status: Exported {done:,}/{total:,} files ({written // 1024:,} KiB)…"
+            )
+
+        def _on_export_finished(self, job, completed):
+            if job is not self._export_job:
+                return
+            self._export_job = None
+            self.combine_button.set_sensitive(bool(self.found_files))
+            if not completed:
+                self.status_label.set_text("Status: Export failed")
+                return
+            note = f", {job.truncated_files:,} truncated" if job.truncated_files else ""
+            self.status_label.set_text(
+                f"Success: Copied {os.path.basename(job.out_path)}{note}"
+            )
+            self.popover.popdown()
+
+        def _wl_copy_uri(self, file_path):
+            """
+            Copy the combined file reference using wl-copy.
+            """
+            try:
+                uri = f"file://{file_path}\n"
+                subprocess.run(
+                    ["wl-copy", "--type", "text/uri-list"],
+                    input=uri.encode("utf-8"),
+                    check=True,
+                )
+            except Exception as e:
+                self.logger.error(f"wl-copy failed: {e}")
+
+        def on_stop(self):
+            self._cancel_search()
+            if self._export_job:
+                self._export_job.cancel()
+            self.scan_engine.shutdown()
+            self._index_cancel.set()
+            for watcher in self.watchers.values():
+                watcher.stop()
+            self.watchers.clear()
+            for index in self.indexes.values():
+                index.close()
+            self.indexes.clear()
+            if self.popover:
+                self.popover.unparent()
+
+    return FileContentSearcher
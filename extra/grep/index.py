@@ -0,0 +1,275 @@
+"""Persistent trigram index used to narrow File Content Searcher candidates."""
+
+import hashlib
+import os
+import sqlite3
+import threading
+
+from .filters import MAX_FILE_BYTES
+from .walker import iter_source_files
+
+# Files larger than this are tracked but not tokenized; they are always
+# returned as candidates so the exact scan still sees them. Indexing files
+# the scan would skip anyway is wasted work, so this defaults to its limit.
+MAX_INDEXED_BYTES = MAX_FILE_BYTES
+
+# Number of files tokenized before the write lock is taken and committed.
+BATCH_SIZE = 256
+
+# SQLite caps compound SELECTs; long queries only need a subset of their
+# trigrams to produce a valid candidate superset.
+MAX_QUERY_TRIGRAMS = 24
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    indexed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    gram BLOB NOT NULL,
+    file_id INTEGER NOT NULL,
+    PRIMARY KEY (gram, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+"""
+
+
+def extract_trigrams(data):
+    """
+    Return the set of lowercase byte trigrams contained in data.
+
+    Content is folded to ASCII lowercase so the same index serves both
+    case-sensitive and case-insensitive lookups.
+    """
+    data = data.lower()
+    return {data[i : i + 3] for i in range(len(data) - 2)}
+
+
+def index_path_for_root(data_dir, root):
+    """Return the database location used for the given search root."""
+    digest = hashlib.sha1(os.path.normpath(root).encode("utf-8")).hexdigest()
+    return os.path.join(data_dir, f"{digest[:16]}.sqlite")
+
+
+class TrigramIndex:
+    """On-disk trigram index for a single search root."""
+
+    def __init__(self, root, db_path, max_indexed_bytes=MAX_INDEXED_BYTES):
+        self.root = root
+        self.db_path = db_path
+        self.max_indexed_bytes = max_indexed_bytes
+        self._lock = threading.RLock()
+        # Bumped on every change to the stored files; used to invalidate
+        # cached search results.
+        self.generation = 0
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # Postings persisted by an earlier session may be stale; candidates
+        # are only trusted once sync() has finished in this process.
+        self.ready = False
+
+    def _get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, str(value)),
+            )
+
+    def _tokenize(self, path, st):
+        """Read a file and return its trigrams, or None if it is not indexed."""
+        if st.st_size > self.max_indexed_bytes:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return extract_trigrams(f.read())
+        except OSError:
+            return None
+
+    def _write_batch(self, items):
+        """Replace the stored state of each (path, stat, trigrams) item."""
+        with self._lock, self._conn:
+            self.generation += 1
+            cur = self._conn.cursor()
+            for path, st, grams in items:
+                row = cur.execute(
+                    "SELECT id FROM files WHERE path = ?", (path,)
+                ).fetchone()
+                values = (
+                    st.st_mtime_ns,
+                    st.st_size,
+                    st.st_ino,
+                    0 if grams is None else 1,
+                )
+                if row:
+                    file_id = row[0]
+                    cur.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+                    cur.execute(
+                        "UPDATE files SET mtime_ns = ?, size = ?, inode = ?, "
+                        "indexed = ? WHERE id = ?",
+                        (*values, file_id),
+                    )
+                else:
+                    cur.execute(
+                        "INSERT INTO files (path, mtime_ns, size, inode, indexed) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (path, *values),
+                    )
+                    file_id = cur.lastrowid
+                if grams:
+                    cur.executemany(
+                        "INSERT OR IGNORE INTO postings (gram, file_id) VALUES (?, ?)",
+                        ((g, file_id) for g in grams),
+                    )
+
+    def _remove_paths(self, paths):
+        with self._lock, self._conn:
+            cur = self._conn.cursor()
+            for path in paths:
+                row = cur.execute(
+                    "SELECT id FROM files WHERE path = ?", (path,)
+                ).fetchone()
+                if not row:
+                    continue
+                cur.execute("DELETE FROM postings WHERE file_id = ?", (row[0],))
+                cur.execute("DELETE FROM files WHERE id = ?", (row[0],))
+                self.generation += 1
+
+    def _known_under(self, top):
+        """Return {path: (mtime_ns, size, inode)} for stored files below top."""
+        with self._lock:
+            if top == self.root:
+                rows = self._conn.execute(
+                    "SELECT path, mtime_ns, size, inode FROM files"
+                )
+            else:
+                prefix = top.rstrip(os.sep) + os.sep
+                rows = self._conn.execute(
+                    "SELECT path, mtime_ns, size, inode FROM files "
+                    "WHERE substr(path, 1, ?) = ?",
+                    (len(prefix), prefix),
+                )
+            return {
+                path: (mtime_ns, size, inode) for path, mtime_ns, size, inode in rows
+            }
+
+    def _reconcile(self, top, source_filter, cancel, visited_dirs):
+        known = self._known_under(top)
+        seen = set()
+        pending = []
+        for path, st in iter_source_files(top, source_filter, visited_dirs):
+            if cancel is not None and cancel.is_set():
+                return False
+            seen.add(path)
+            if known.get(path) == (st.st_mtime_ns, st.st_size, st.st_ino):
+                continue
+            pending.append((path, st, self._tokenize(path, st)))
+            if len(pending) >= BATCH_SIZE:
+                self._write_batch(pending)
+                pending = []
+
+        if pending:
+            self._write_batch(pending)
+        self._remove_paths(set(known) - seen)
+        return True
+
+    def sync(self, source_filter, cancel=None, visited_dirs=None):
+        """
+        Bring the index in line with the tree on disk.
+
+        Only files whose (mtime, size, inode) differ from the stored values
+        are re-tokenized; files that disappeared are dropped. Meant to run
+        in a worker thread.
+        """
+        if not self._reconcile(self.root, source_filter, cancel, visited_dirs):
+            return False
+        self._set_meta("built", 1)
+        self.ready = True
+        return True
+
+    def update_paths(self, paths, source_filter):
+        """
+        Apply a batch of changed paths reported by a file watcher.
+
+        Files are re-tokenized only if their (mtime, size, inode) changed,
+        missing or newly excluded paths are dropped together with anything
+        stored below them, and directories are reconciled as a subtree.
+        Returns the list of directories that were walked so the caller can
+        watch new ones.
+        """
+        new_dirs = []
+        pending = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                self._remove_paths([path, *self._known_under(path)])
+                continue
+
+            is_dir = os.path.isdir(path)
+            if source_filter.is_path_excluded(self.root, path, is_dir):
+                self._remove_paths([path, *self._known_under(path)])
+                continue
+            if is_dir:
+                self._reconcile(path, source_filter, None, new_dirs)
+                continue
+            if not source_filter.wants_extension(path) or not source_filter.accept(
+                path, st
+            ):
+                self._remove_paths([path])
+                continue
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT mtime_ns, size, inode FROM files WHERE path = ?",
+                    (path,),
+                ).fetchone()
+            if row != (st.st_mtime_ns, st.st_size, st.st_ino):
+                pending.append((path, st, self._tokenize(path, st)))
+
+        if pending:
+            self._write_batch(pending)
+        return new_dirs
+
+    def candidates(self, query_bytes):
+        """
+        Return the paths that may contain query_bytes, or None when the index
+        has not been built yet and the caller must fall back to a full walk.
+        """
+        if not self.ready:
+            return None
+
+        grams = sorted(extract_trigrams(query_bytes))[:MAX_QUERY_TRIGRAMS]
+        with self._lock:
+            if not grams:
+                rows = self._conn.execute("SELECT path FROM files")
+            else:
+                subquery = " INTERSECT ".join(
+                    ["SELECT file_id FROM postings WHERE gram = ?"] * len(grams)
+                )
+                rows = self._conn.execute(
+                    f"SELECT path FROM files WHERE indexed = 0 OR id IN ({subquery})",
+                    grams,
+                )
+            return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
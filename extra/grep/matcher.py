@@ -0,0 +1,155 @@
+"""Query compilation for the File Content Searcher."""
+
+import functools
+import re
+
+REGEX_META = b".^$*+?{}[]\\|()"
+QUANTIFIERS = b"*?{"
+# Global or scoped inline flags such as (?i), (?x) or (?s-i:...).
+INLINE_FLAGS = re.compile(rb"\(\?[aiLmsux-]+[:)]")
+
+
+@functools.lru_cache(maxsize=64)
+def compile_pattern(text, regex, ignore_case, whole_word):
+    """
+    Return a compiled bytes pattern for the given search options, or None
+    when a plain substring search is enough. Cached on (pattern, flags).
+    """
+    if not (regex or ignore_case or whole_word):
+        return None
+    body = text if regex else re.escape(text)
+    if whole_word:
+        body = rb"\b(?:" + body + rb")\b"
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    return re.compile(body, flags)
+
+
+@functools.lru_cache(maxsize=64)
+def required_literal(text, regex):
+    """
+    Return the longest byte string every match must contain.
+
+    For plain searches this is the query itself. For regexes only runs of
+    literal characters outside groups, classes and alternations are
+    considered, which keeps the answer conservative: an empty result means
+    no prefilter is possible.
+    """
+    if not regex:
+        return text
+    if INLINE_FLAGS.search(text):
+        # Inline flags change what the literal text means: (?i) matches any
+        # case, (?x) turns whitespace and comments into no-ops. Skip the
+        # prefilter rather than second-guess them.
+        return b""
+
+    best = b""
+    run = bytearray()
+    depth = 0
+    i = 0
+    n = len(text)
+
+    def close_run():
+        nonlocal best
+        if len(run) > len(best):
+            best = bytes(run)
+        run.clear()
+
+    while i < n:
+        c = text[i : i + 1]
+        if c == b"\\" and i + 1 < n:
+            nxt = text[i + 1 : i + 2]
+            if nxt.isalnum():
+                close_run()
+            elif depth == 0:
+                run += nxt
+            i += 2
+        elif c == b"[":
+            close_run()
+            end = text.find(b"]", i + 2)
+            i = n if end == -1 else end + 1
+        elif c == b"(":
+            close_run()
+            depth += 1
+            i += 1
+        elif c == b")":
+            depth = max(0, depth - 1)
+            i += 1
+        elif c == b"|":
+            if depth == 0:
+                return b""
+            i += 1
+        elif c in QUANTIFIERS or c == b"+":
+            # The quantified atom may repeat or vanish; keep only what precedes it.
+            if c != b"+" and run:
+                run.pop()
+            close_run()
+            if c == b"{":
+                end = text.find(b"}", i)
+                i = n if end == -1 else end + 1
+            else:
+                i += 1
+        elif c in REGEX_META:
+            close_run()
+            i += 1
+        else:
+            if depth == 0:
+                run += c
+            else:
+                close_run()
+            i += 1
+    close_run()
+    return best
+
+
+class Query:
+    """
+    Search text plus options. Instances are small and picklable so they can
+    be shipped to scan workers; compiled state is cached per process.
+    """
+
+    def __init__(self, text, regex=False, ignore_case=False, whole_word=False):
+        self.text = text
+        self.regex = regex
+        self.ignore_case = ignore_case
+        self.whole_word = whole_word
+
+    @property
+    def key(self):
+        return (self.text, self.regex, self.ignore_case, self.whole_word)
+
+    @property
+    def pattern(self):
+        """Compiled pattern, or None for plain substring searches."""
+        return compile_pattern(*self.key)
+
+    @property
+    def literal(self):
+        """Bytes every match contains, used as prefilter and for index lookups."""
+        return required_literal(self.text, self.regex)
+
+    def search(self, buf):
+        """Return True if buf (bytes or mmap) contains a match."""
+        literal = self.literal
+        if literal and not self.ignore_case and buf.find(literal) == -1:
+            return False
+        pattern = self.pattern
+        if pattern is None:
+            return bool(literal)
+        return pattern.search(buf) is not None
+
+    def finditer(self, buf):
+        """Yield the start offset of every match in buf (bytes or mmap)."""
+        literal = self.literal
+        if literal and not self.ignore_case and buf.find(literal) == -1:
+            return
+        pattern = self.pattern
+        if pattern is None:
+            if not literal:
+                return
+            pos = buf.find(literal)
+            while pos != -1:
+                yield pos
+                pos = buf.find(literal, pos + len(literal))
+            return
+        for match in pattern.finditer(buf):
+            yield match.start()
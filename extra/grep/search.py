@@ -0,0 +1,256 @@
+"""Cancellable content search used by the File Content Searcher."""
+
+import itertools
+import mmap
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import NamedTuple
+
+from .walker import iter_source_files
+
+# Matching lines recorded per file; enough for snippets without letting a
+# pathological file (minified code, huge logs) dominate a result set.
+MAX_MATCH_LINES = 200
+
+
+class FileMatch(NamedTuple):
+    """A matching file and the (line_number, byte_offset) of each matching line."""
+
+    path: str
+    lines: list
+
+
+def find_matches(file_path, query, max_lines=MAX_MATCH_LINES):
+    """
+    Optimized search for a single file using mmap. The query runs directly
+    against the mapped buffer and line numbers are counted while it is
+    still open. Returns a FileMatch or None.
+    """
+    try:
+        if os.path.getsize(file_path) == 0:
+            return None
+        with open(file_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                lines = []
+                line_no, counted_to = 1, 0
+                for offset in query.finditer(mm):
+                    if offset < counted_to:
+                        continue
+                    line_no += mm[counted_to:offset].count(b"\n")
+                    lines.append((line_no, offset))
+                    if len(lines) >= max_lines:
+                        break
+                    # Skip the rest of this line; one entry per line is enough.
+                    eol = mm.find(b"\n", offset)
+                    if eol == -1:
+                        break
+                    line_no += 1
+                    counted_to = eol + 1
+                return FileMatch(file_path, lines) if lines else None
+    except Exception:
+        return None
+
+
+def scan_chunk(paths, query):
+    """
+    Return a FileMatch for each path matching query. Runs inside pool workers.
+    """
+    return [m for m in map(find_matches, paths, itertools.repeat(query)) if m]
+
+
+def _chunked(iterable, size):
+    it = iter(iterable)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+class ScanEngine:
+    """
+    Scans candidate files in chunks on a thread or process pool.
+
+    CPython's regex engine and mmap.find hold the GIL, so only processes
+    spread the CPU-bound part of a scan over several cores; threads merely
+    overlap file I/O. The default mode "auto" therefore picks processes on
+    machines with more than one core and threads otherwise, where a pool
+    of processes only adds pickling overhead. The process pool is created
+    without waiting on its workers; if a chunk fails there (e.g. the
+    workers cannot import this module) the engine switches to threads and
+    rescans that chunk. Candidate streams shorter than serial_threshold are
+    scanned in the calling thread, where pool overhead would dominate.
+    """
+
+    def __init__(self, mode="auto", workers=0, chunk_size=64, serial_threshold=256):
+        if mode == "auto":
+            mode = "processes" if (os.cpu_count() or 1) > 1 else "threads"
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.serial_threshold = serial_threshold
+        self.fallback_reason = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self, query):
+        with self._lock:
+            if self._executor is not None:
+                return self._executor
+            if self.mode == "processes":
+                try:
+                    pickle.dumps(query)
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("forkserver"),
+                    )
+                    return self._executor
+                except Exception as e:
+                    self.fallback_reason = f"process pool unavailable: {e}"
+                    self.mode = "threads"
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="grep-scan"
+            )
+            return self._executor
+
+    def _fall_back(self, reason):
+        """Switch from the process pool to threads after a failed chunk."""
+        with self._lock:
+            if self.mode != "processes":
+                return
+            self.fallback_reason = f"process pool unavailable: {reason}"
+            self.mode = "threads"
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def scan(self, paths, query, cancelled, on_chunk):
+        """
+        Call on_chunk(matches, scanned_count) for every chunk of paths until
+        the stream is exhausted or cancelled() returns True.
+        """
+        it = iter(paths)
+        head = list(itertools.islice(it, self.serial_threshold))
+        if len(head) < self.serial_threshold or self.workers <= 1:
+            for chunk in _chunked(itertools.chain(head, it), self.chunk_size):
+                if cancelled():
+                    return
+                on_chunk(scan_chunk(chunk, query), len(chunk))
+            return
+
+        max_in_flight = self.workers * 2
+        in_flight = {}
+
+        def drain(return_when):
+            done, _ = wait(in_flight, return_when=return_when)
+            for future in done:
+                chunk = in_flight.pop(future)
+                if cancelled():
+                    continue
+                try:
+                    matches = future.result()
+                except Exception as e:
+                    self._fall_back(e)
+                    matches = scan_chunk(chunk, query)
+                on_chunk(matches, len(chunk))
+
+        try:
+            for chunk in _chunked(itertools.chain(head, it), self.chunk_size):
+                if cancelled():
+                    return
+                try:
+                    future = self._get_executor(query).submit(scan_chunk, chunk, query)
+                except Exception as e:
+                    self._fall_back(e)
+                    future = self._get_executor(query).submit(scan_chunk, chunk, query)
+                in_flight[future] = chunk
+                if len(in_flight) >= max_in_flight:
+                    drain(FIRST_COMPLETED)
+            while in_flight and not cancelled():
+                drain(FIRST_COMPLETED)
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+class SearchJob:
+    """
+    One search over a root directory.
+
+    run() is meant for a worker thread: it reports matches in batches
+    through on_batch and stops as soon as cancel() is called from any
+    thread. candidates restricts the scan to known paths, e.g. when
+    refining an earlier result set.
+    """
+
+    def __init__(self, root, query, source_filter, index=None, candidates=None):
+        self.root = root
+        self.query = query
+        self.source_filter = source_filter
+        self.index = index
+        self.candidates = candidates
+        # Tree generation the caller observed at start; used for caching.
+        self.generation = None
+        self.scanned = 0
+        self.matches = []
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _candidates(self):
+        if self.candidates is not None:
+            return self.candidates
+        candidates = self.index.candidates(self.query.literal) if self.index else None
+        if candidates is not None:
+            return candidates
+        return (path for path, _ in iter_source_files(self.root, self.source_filter))
+
+    def run(self, on_batch=None, engine=None, batch_interval=0.1):
+        """
+        Scan every candidate file and return the list of FileMatch results.
+
+        Without an engine the scan is serial. on_batch(new_matches, scanned)
+        is called at most once per batch_interval seconds and once more at
+        the end.
+        """
+        engine = engine or ScanEngine(workers=1)
+        pending = []
+        last_report = time.monotonic()
+
+        def on_chunk(matches, scanned):
+            nonlocal pending, last_report
+            self.scanned += scanned
+            self.matches.extend(matches)
+            pending.extend(matches)
+            now = time.monotonic()
+            if on_batch and now - last_report >= batch_interval:
+                on_batch(pending, self.scanned)
+                pending = []
+                last_report = now
+
+        engine.scan(
+            self._candidates(),
+            self.query,
+            lambda: self.cancelled,
+            on_chunk,
+        )
+        if on_batch and not self.cancelled:
+            on_batch(pending, self.scanned)
+        return self.matches
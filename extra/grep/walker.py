@@ -0,0 +1,57 @@
+"""Filesystem traversal shared by the content index and the scanner."""
+
+import os
+
+from .filters import IGNORE_FILES
+
+
+def iter_source_files(root, source_filter, visited_dirs=None):
+    """
+    Yield (path, stat_result) for every source file below root accepted by
+    source_filter.
+
+    Uses os.scandir so each entry is stat-ed at most once; ignored
+    directories and .gitignore/.ignore matches are pruned before they are
+    entered. When visited_dirs is a list, every directory walked is
+    appended to it.
+    """
+    stack = [(root, ())]
+    while stack:
+        current, parent_chain = stack.pop()
+        if visited_dirs is not None:
+            visited_dirs.append(current)
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        chain = parent_chain
+        ignore_stats = {}
+        for entry in entries:
+            if entry.name in IGNORE_FILES:
+                try:
+                    ignore_stats[entry.name] = entry.stat()
+                except OSError:
+                    continue
+        rules = source_filter.rules_for_dir(current, ignore_stats)
+        if rules:
+            chain = parent_chain + ((current, rules),)
+
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in source_filter.ignored_dirs and not (
+                        chain and source_filter.is_ignored(entry.path, True, chain)
+                    ):
+                        stack.append((entry.path, chain))
+                    continue
+                if not entry.is_file() or not source_filter.wants_extension(entry.name):
+                    continue
+                if chain and source_filter.is_ignored(entry.path, False, chain):
+                    continue
+                st = entry.stat()
+                if source_filter.accept(entry.path, st):
+                    yield entry.path, st
+            except OSError:
+                continue
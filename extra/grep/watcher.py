@@ -0,0 +1,117 @@
+"""Gio.FileMonitor based maintenance of a TrigramIndex."""
+
+import os
+
+from gi.repository import Gio  # pyright: ignore
+
+RELEVANT_EVENTS = {
+    Gio.FileMonitorEvent.CREATED,
+    Gio.FileMonitorEvent.DELETED,
+    Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+    Gio.FileMonitorEvent.MOVED_IN,
+    Gio.FileMonitorEvent.MOVED_OUT,
+    Gio.FileMonitorEvent.RENAMED,
+}
+
+
+class IndexWatcher:
+    """
+    Watches every directory of a search root and feeds changed paths back
+    into its index.
+
+    Events are collected for debounce_ms after the first one arrives and
+    then applied as a single batch in a worker thread, so bursts such as a
+    git checkout cost one index transaction instead of thousands.
+    """
+
+    def __init__(self, plugin, index, debounce_ms=750, max_dirs=8192):
+        self.p = plugin
+        self.index = index
+        self.debounce_ms = debounce_ms
+        self.max_dirs = max_dirs
+        self.monitors = {}
+        self._pending = set()
+        self._timer_id = None
+        self._limit_warned = False
+        # False once a directory could not be watched; changes below it go
+        # unnoticed, so the generation no longer covers the whole tree.
+        self.complete = True
+        # Bumped on every relevant event, before the batch is applied, so
+        # cached results are invalidated without waiting for the debounce.
+        self.generation = 0
+
+    def watch_dirs(self, dirs):
+        """Start monitoring the given directories. Must run on the GTK thread."""
+        for path in dirs:
+            if path in self.monitors:
+                continue
+            if len(self.monitors) >= self.max_dirs:
+                self.complete = False
+                if not self._limit_warned:
+                    self._limit_warned = True
+                    self.p.logger.warning(
+                        f"Watch limit of {self.max_dirs} directories reached for "
+                        f"{self.index.root}; deeper changes are picked up on restart."
+                    )
+                return
+            try:
+                monitor = Gio.File.new_for_path(path).monitor_directory(
+                    Gio.FileMonitorFlags.WATCH_MOVES, None
+                )
+            except Exception as e:
+                self.p.logger.warning(f"Cannot watch {path}: {e}")
+                self.complete = False
+                continue
+            monitor.connect("changed", self._on_changed)
+            self.monitors[path] = monitor
+
+    def _unwatch_tree(self, path):
+        prefix = path.rstrip(os.sep) + os.sep
+        for watched in list(self.monitors):
+            if watched == path or watched.startswith(prefix):
+                self.monitors.pop(watched).cancel()
+
+    def _on_changed(self, _monitor, gfile, other_file, event_type):
+        if event_type not in RELEVANT_EVENTS:
+            return
+        self.generation += 1
+
+        path = gfile.get_path()
+        if path:
+            if event_type in (
+                Gio.FileMonitorEvent.DELETED,
+                Gio.FileMonitorEvent.MOVED_OUT,
+                Gio.FileMonitorEvent.RENAMED,
+            ):
+                self._unwatch_tree(path)
+            self._pending.add(path)
+        if other_file is not None and other_file.get_path():
+            self._pending.add(other_file.get_path())
+
+        if self._timer_id is None:
+            self._timer_id = self.p.glib.timeout_add(self.debounce_ms, self._flush)
+
+    def _flush(self):
+        self._timer_id = None
+        batch, self._pending = self._pending, set()
+        if batch:
+            self.p.run_in_thread(self._apply_batch, batch)
+        return False
+
+    def _apply_batch(self, batch):
+        try:
+            new_dirs = self.index.update_paths(batch, self.p.source_filter)
+        except Exception as e:
+            self.p.logger.error(f"Index update for {self.index.root} failed: {e}")
+            return
+        if new_dirs:
+            self.p.schedule_in_gtk_thread(self.watch_dirs, new_dirs)
+
+    def stop(self):
+        if self._timer_id is not None:
+            self.p.glib.source_remove(self._timer_id)
+            self._timer_id = None
+        for monitor in self.monitors.values():
+            monitor.cancel()
+        self.monitors.clear()
+        self._pending.clear()
@@ -0,0 +1,112 @@
+def get_frecency_logic():
+    import os
+    import json
+    import math
+    import time
+
+    class FrecencyStore:
+        """
+        Remembers how often and how recently files were opened.
+
+        Each path keeps a score and the time it was last bumped. Scores
+        decay exponentially with half_life_days, but the decay is applied
+        lazily when a score is read or bumped, so nothing is rewritten just
+        because time passed. The store is a small JSON file that is
+        rewritten on each launch and trimmed to max_entries.
+        """
+
+        def __init__(self, plugin, half_life_days=7.0, max_entries=2000):
+            self.p = plugin
+            self.half_life = half_life_days * 86400
+            self.max_entries = max_entries
+            self._entries = None
+
+        def _path(self):
+            return os.path.join(
+                self.p._path_handler.get_data_path(),
+                "open_with_editor",
+                "frecency.json",
+            )
+
+        def _load(self):
+            if self._entries is not None:
+                return self._entries
+            self._entries = {}
+            try:
+                with open(self._path(), "r") as f:
+                    data = json.load(f)
+                self._entries = {
+                    path: (float(score), float(stamp))
+                    for path, (score, stamp) in data.items()
+                }
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                self.p.logger.warning(f"Discarding frecency data: {e}")
+            return self._entries
+
+        def _save(self):
+            path = self._path()
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(self._entries, f, separators=(",", ":"))
+                os.replace(tmp_path, path)
+            except Exception as e:
+                self.p.logger.warning(f"Could not save frecency data: {e}")
+
+        def _decayed(self, score, stamp, now):
+            return score * 0.5 ** (max(0.0, now - stamp) / self.half_life)
+
+        def record(self, path):
+            """Bump the score of path after it was opened."""
+            entries = self._load()
+            now = time.time()
+            score, stamp = entries.get(path, (0.0, now))
+            entries[path] = (self._decayed(score, stamp, now) + 1.0, now)
+
+            if len(entries) > self.max_entries:
+                ranked = sorted(
+                    entries.items(),
+                    key=lambda kv: self._decayed(kv[1][0], kv[1][1], now),
+                    reverse=True,
+                )
+                self._entries = dict(ranked[: self.max_entries])
+            self._save()
+
+        def ranked(self, root, limit=50):
+            """Return the most frecent existing files below root, best first."""
+            now = time.time()
+            prefix = root.rstrip(os.sep) + os.sep
+            scored = [
+                (self._decayed(score, stamp, now), path)
+                for path, (score, stamp) in self._load().items()
+                if path.startswith(prefix)
+            ]
+            scored.sort(reverse=True)
+            return [path for _, path in scored[:limit] if os.path.isfile(path)]
+
+        def last_used(self, root):
+            """Time a file below root was last opened, or 0."""
+            prefix = root.rstrip(os.sep) + os.sep
+            return max(
+                (
+                    stamp
+                    for path, (_, stamp) in self._load().items()
+                    if path.startswith(prefix)
+                ),
+                default=0.0,
+            )
+
+        def boosts(self, root, weight=8.0):
+            """Map the frecent files below root to a bonus for the fuzzy ranking."""
+            now = time.time()
+            prefix = root.rstrip(os.sep) + os.sep
+            return {
+                path: weight * math.log2(1.0 + self._decayed(score, stamp, now))
+                for path, (score, stamp) in self._load().items()
+                if path.startswith(prefix)
+            }
+
+    return FrecencyStore
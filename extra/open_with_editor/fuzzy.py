@@ -0,0 +1,256 @@
+def get_fuzzy_logic():
+    import os
+    import re
+    import time
+    import heapq
+
+    SCORE_MATCH = 16
+    SCORE_GAP_START = -3
+    SCORE_GAP_EXTENSION = -1
+    BONUS_BOUNDARY = 8
+    BONUS_SEPARATOR = 9
+    BONUS_CAMEL = 7
+    BONUS_CONSECUTIVE = 4
+    BONUS_FIRST_CHAR_MULTIPLIER = 2
+    BONUS_BASENAME = 2
+    BONUS_BASENAME_PREFIX = 12
+
+    def _bonus_at(text, original, i):
+        """Bonus for a match at position i, based on the preceding character."""
+        if i == 0:
+            return BONUS_SEPARATOR
+        prev = text[i - 1]
+        if prev == "/":
+            return BONUS_SEPARATOR
+        if not prev.isalnum():
+            return BONUS_BOUNDARY
+        if original[i - 1].islower() and original[i].isupper():
+            return BONUS_CAMEL
+        return 0
+
+    def score_positions(text, original, positions, base_start):
+        """Score a set of matched positions the way fzf's v1 algorithm does."""
+        score = 0
+        prev = -2
+        consecutive_bonus = 0
+        for n, i in enumerate(positions):
+            bonus = _bonus_at(text, original, i)
+            if i == prev + 1:
+                consecutive_bonus = max(consecutive_bonus, bonus, BONUS_CONSECUTIVE)
+                bonus = max(bonus, consecutive_bonus)
+            else:
+                consecutive_bonus = bonus
+                if n:
+                    gap = i - prev - 1
+                    score += SCORE_GAP_START + SCORE_GAP_EXTENSION * (gap - 1)
+            if n == 0:
+                bonus *= BONUS_FIRST_CHAR_MULTIPLIER
+            score += SCORE_MATCH + bonus
+            prev = i
+
+        if positions[0] >= base_start:
+            score += BONUS_BASENAME * len(positions)
+            if positions[0] == base_start:
+                score += BONUS_BASENAME_PREFIX
+        return score
+
+    def _rightmost_positions(text, query):
+        """Match query as a subsequence, preferring the rightmost characters."""
+        positions = []
+        i = len(text)
+        for c in reversed(query):
+            i = text.rfind(c, 0, i)
+            if i < 0:
+                return None
+            positions.append(i)
+        positions.reverse()
+        return positions
+
+    def _tightened_positions(text, query):
+        """
+        Leftmost forward match, then walk back from its end to find the
+        shortest window, as fzf v1 does.
+        """
+        i = -1
+        for c in query:
+            i = text.find(c, i + 1)
+            if i < 0:
+                return None
+        positions = []
+        for c in reversed(query):
+            i = text.rfind(c, 0, i + 1)
+            positions.append(i)
+            i -= 1
+        positions.reverse()
+        return positions
+
+    class FuzzySearch:
+        """
+        One running query. The work is done in slices by step(), so the
+        caller can spread a search over several main loop iterations and
+        drop it when the query changes.
+        """
+
+        def __init__(self, steps):
+            self._steps = steps
+            self.done = False
+            self.results = []
+
+        def step(self, budget):
+            """Work for up to budget seconds; return True once finished."""
+            deadline = time.perf_counter() + budget
+            while not self.done:
+                try:
+                    next(self._steps)
+                except StopIteration as stop:
+                    self.done = True
+                    self.results = stop.value or []
+                    break
+                if time.perf_counter() >= deadline:
+                    break
+            return self.done
+
+        def run(self):
+            while not self.step(1.0):
+                pass
+            return self.results
+
+    class FuzzyMatcher:
+        """
+        fzf-style fuzzy ranking over the file list of one directory.
+
+        Lowercase relative paths are precomputed once per list and joined
+        into chunked buffers, so the subsequence filter runs as regex
+        passes in C. Only a bounded pool of candidates, preferring
+        contiguous basename matches and short paths, gets the full
+        positional score. When a query extends the previous one, the
+        previous candidates are filtered instead of the whole list.
+        """
+
+        CHUNK = 2048
+
+        def __init__(self, paths, root, max_scored=1500):
+            self.paths = paths
+            self.max_scored = max_scored
+            prefix_len = len(root.rstrip(os.sep)) + 1
+            self.rel = [p[prefix_len:] for p in paths]
+            self.lower = [r.lower() for r in self.rel]
+            self.base_start = [r.rfind("/") + 1 for r in self.lower]
+            self.lengths = [len(r) for r in self.lower]
+            # "\n<path>\t<index>" records: the leading newline gives every
+            # pattern a literal prefix, which the regex engine scans for fast.
+            self.chunks = [
+                "".join(
+                    f"\n{r}\t{i}"
+                    for i, r in enumerate(self.lower[start : start + self.CHUNK], start)
+                    if "\n" not in r
+                )
+                for start in range(0, len(self.lower), self.CHUNK)
+            ]
+            self._last_query = None
+            self._last_candidates = None
+            self._index_of = None
+
+        def index_of(self):
+            """Map of path to its position, built on first use."""
+            if self._index_of is None:
+                self._index_of = {p: i for i, p in enumerate(self.paths)}
+            return self._index_of
+
+        @staticmethod
+        def _subsequence_pattern(query):
+            return "".join(f"[^{re.escape(c)}\\n]*{re.escape(c)}" for c in query)
+
+        def _filter(self, query):
+            """Yield between chunks; returns every index matching query."""
+            last = self._last_query
+            candidates = []
+            if last and query.startswith(last) and self._last_candidates is not None:
+                match = re.compile(self._subsequence_pattern(query)).match
+                lower = self.lower
+                previous = self._last_candidates
+                for start in range(0, len(previous), self.CHUNK):
+                    candidates.extend(
+                        i
+                        for i in previous[start : start + self.CHUNK]
+                        if match(lower[i])
+                    )
+                    yield
+            else:
+                findall = re.compile(
+                    rf"\n{self._subsequence_pattern(query)}[^\n]*\t(\d+)"
+                ).findall
+                for chunk in self.chunks:
+                    candidates.extend(map(int, findall(chunk)))
+                    yield
+            self._last_query, self._last_candidates = query, candidates
+            return candidates
+
+        def _pool(self, query, candidates):
+            """Yield between chunks; returns the candidates worth a full score."""
+            if len(candidates) <= self.max_scored:
+                return candidates
+            lower, base_start = self.lower, self.base_start
+            contiguous, rest = [], []
+            for start in range(0, len(candidates), self.CHUNK):
+                for i in candidates[start : start + self.CHUNK]:
+                    if query in lower[i][base_start[i] :]:
+                        contiguous.append(i)
+                    else:
+                        rest.append(i)
+                yield
+            contiguous.sort(key=self.lengths.__getitem__)
+            if len(contiguous) >= self.max_scored:
+                return contiguous[: self.max_scored]
+            yield
+            rest.sort(key=self.lengths.__getitem__)
+            return contiguous + rest[: self.max_scored - len(contiguous)]
+
+        def _score(self, query, pool, boost=None):
+            lower, rel, base_start = self.lower, self.rel, self.base_start
+            scored = []
+            for n, i in enumerate(pool):
+                if n & 127 == 127:
+                    yield scored
+                text = lower[i]
+                best = None
+                for positions in (
+                    _rightmost_positions(text, query),
+                    _tightened_positions(text, query),
+                ):
+                    if positions:
+                        score = score_positions(text, rel[i], positions, base_start[i])
+                        if best is None or score > best:
+                            best = score
+                if best is not None:
+                    if boost:
+                        best += boost.get(self.paths[i], 0.0)
+                    scored.append((best, -self.lengths[i], i))
+            return scored
+
+        def _search(self, query, limit, boost):
+            candidates = yield from self._filter(query)
+            pool = yield from self._pool(query, candidates)
+            if boost:
+                # Frecent files always get scored, however large the pool.
+                index_of = self.index_of()
+                match = re.compile(self._subsequence_pattern(query)).match
+                in_pool = set(pool)
+                pool = [
+                    i
+                    for i in map(index_of.get, boost)
+                    if i is not None and i not in in_pool and match(self.lower[i])
+                ] + pool
+            scored = yield from self._score(query, pool, boost)
+            return [self.paths[i] for _, _, i in heapq.nlargest(limit, scored)]
+
+        def search(self, query, limit=200, boost=None):
+            """
+            Start ranking the paths matching query and return the
+            FuzzySearch; its results hold up to limit paths, best first.
+            boost maps paths to a bonus added to their score.
+            """
+            query = "".join(query.lower().split())
+            return FuzzySearch(self._search(query, limit, boost) if query else iter(()))
+
+    return FuzzyMatcher
@@ -0,0 +1,180 @@
+def get_gitignore_logic():
+    import os
+    import re
+
+    def translate(pattern):
+        """
+        Translate one .gitignore line into (regex, negate, dir_only), or
+        None for blanks and comments. The regex must fullmatch the path
+        relative to the directory holding the .gitignore.
+        """
+        pattern = pattern.rstrip("\n")
+        if pattern.endswith(" ") and not pattern.endswith("\\ "):
+            pattern = pattern.rstrip(" ")
+        if not pattern or pattern.startswith("#"):
+            return None
+
+        negate = pattern.startswith("!")
+        if negate:
+            pattern = pattern[1:]
+        elif pattern.startswith("\\!") or pattern.startswith("\\#"):
+            pattern = pattern[1:]
+
+        dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        if not pattern:
+            return None
+
+        anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+
+        out = []
+        i, n = 0, len(pattern)
+        while i < n:
+            c = pattern[i]
+            if pattern.startswith("**/", i):
+                out.append("(?:.*/)?")
+                i += 3
+            elif pattern.startswith("/**", i) and i + 3 == n:
+                out.append("/.*")
+                i += 3
+            elif pattern.startswith("**", i):
+                out.append(".*")
+                i += 2
+            elif c == "*":
+                out.append("[^/]*")
+                i += 1
+            elif c == "?":
+                out.append("[^/]")
+                i += 1
+            elif c == "[":
+                end = pattern.find("]", i + 2)
+                if end == -1:
+                    out.append(re.escape(c))
+                    i += 1
+                    continue
+                body = pattern[i + 1 : end].replace("\\", "\\\\")
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end + 1
+            elif c == "\\" and i + 1 < n:
+                out.append(re.escape(pattern[i + 1]))
+                i += 2
+            else:
+                out.append(re.escape(c))
+                i += 1
+
+        body = "".join(out)
+        if not anchored:
+            body = f"(?:.*/)?{body}"
+        return body, negate, dir_only
+
+    class IgnoreLevel:
+        """
+        The rules of one .gitignore, compiled into a single alternation per
+        entry kind. Alternatives are stored last-rule-first so the first
+        alternative that matches is the rule git would apply.
+        """
+
+        __slots__ = ("base", "prefix_len", "file_re", "file_neg", "dir_re", "dir_neg")
+
+        def __init__(self, base, lines):
+            self.base = base
+            self.prefix_len = len(base.rstrip(os.sep)) + 1
+            rules = [r for r in map(translate, lines) if r]
+            rules.reverse()
+            self.file_re, self.file_neg = self._compile([r for r in rules if not r[2]])
+            self.dir_re, self.dir_neg = self._compile(rules)
+
+        @staticmethod
+        def _compile(rules):
+            if not rules:
+                return None, ()
+            regex = re.compile("|".join(f"({body})" for body, _, _ in rules))
+            return regex, tuple(negate for _, negate, _ in rules)
+
+        def match(self, path, is_dir):
+            """
+            Return True (ignored), False (re-included by a negation) or None
+            when no rule of this level applies.
+            """
+            regex, negations = (
+                (self.dir_re, self.dir_neg) if is_dir else (self.file_re, self.file_neg)
+            )
+            if regex is None:
+                return None
+            m = regex.fullmatch(path, self.prefix_len)
+            if m is None:
+                return None
+            return not negations[m.lastindex - 1]
+
+    class IgnoreStack:
+        """
+        The .gitignore levels in effect for a directory, outermost first.
+        Deeper levels take precedence, matching git's behaviour.
+        """
+
+        __slots__ = ("levels",)
+
+        def __init__(self, levels=()):
+            self.levels = levels
+
+        def push(self, level):
+            if level is None:
+                return self
+            return IgnoreStack(self.levels + (level,))
+
+        def is_ignored(self, path, is_dir):
+            for level in reversed(self.levels):
+                verdict = level.match(path, is_dir)
+                if verdict is not None:
+                    return verdict
+            return False
+
+    class GitignoreEngine:
+        """
+        Loads and compiles .gitignore files once, reusing the compiled level
+        until the file's mtime changes.
+        """
+
+        def __init__(self):
+            self._levels = {}
+
+        def load(self, directory, mtime=None):
+            """
+            Return the compiled IgnoreLevel for directory/.gitignore, or None.
+            mtime may be the st_mtime_ns already obtained while listing.
+            """
+            path = os.path.join(directory, ".gitignore")
+            if mtime is None:
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    self._levels.pop(path, None)
+                    return None
+
+            cached = self._levels.get(path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            try:
+                with open(path, "r", errors="ignore") as f:
+                    level = IgnoreLevel(directory, f.read().splitlines())
+            except OSError:
+                return None
+            self._levels[path] = (mtime, level)
+            return level
+
+        def stack_for(self, root, directory):
+            """Build the IgnoreStack for directory by loading every level from root."""
+            stack = IgnoreStack().push(self.load(root))
+            rel = os.path.relpath(directory, root)
+            if rel in (".", "") or rel.startswith(".."):
+                return stack
+            current = root
+            for part in rel.split(os.sep):
+                current = os.path.join(current, part)
+                stack = stack.push(self.load(current))
+            return stack
+
+    return GitignoreEngine, IgnoreStack
@@ -1,11 +1,23 @@
 def get_launcher_logic():
     import os
+    import time
+    import codecs
     import tempfile
+    import threading
+    import subprocess
+
+    # Bytes read per step while streaming files into a context export.
+    CONTEXT_CHUNK = 64 * 1024
+    # Exports up to this size are also added to the clipboard plugin's
+    # history; larger ones only live in wl-copy instead of being read back.
+    CLIPBOARD_SYNC_MAX = 1024 * 1024
 
     class FileLauncher:
         def __init__(self, plugin):
             self.p = plugin
             self.tui_editors = ["nvim", "vi", "vim", "emacs", "nano", "micro", "ed"]
+            self._context_running = False
+            self._context_cancel = threading.Event()
 
         def init_config(self):
             raw_dirs = self.p.get_plugin_setting(
@@ -29,56 +41,192 @@ def get_launcher_logic():
                 ["kitty", "alacritty", "gnome-terminal", "xterm"],
             )
 
+            self.p.max_results = self.p.get_plugin_setting(
+                ["search", "max_results"], 200
+            )
+
+            self.p.context_max_total_bytes = self.p.get_plugin_setting(
+                ["context", "max_total_bytes"], 16 * 1024 * 1024
+            )
+            self.p.context_max_file_bytes = self.p.get_plugin_setting(
+                ["context", "max_file_bytes"], 1024 * 1024
+            )
+
+            self.p.scan_prewarm = self.p.get_plugin_setting(["scan", "prewarm"], True)
+            self.p.scan_max_workers = self.p.get_plugin_setting(
+                ["scan", "max_workers"], 2
+            )
+
+            self.p.watch_enabled = self.p.get_plugin_setting(["watch", "enabled"], True)
+            self.p.watch_debounce_ms = self.p.get_plugin_setting(
+                ["watch", "debounce_ms"], 500
+            )
+            self.p.max_watched_dirs = self.p.get_plugin_setting(
+                ["watch", "max_watched_dirs"], 4096
+            )
+
         def copy_directory_context(self, clicked_file_path, as_file=False):
-            """Aggregates files into /tmp/ and copies via wl-copy."""
+            """
+            Streams the files next to clicked_file_path into a file under
+            /tmp/ in a worker thread, then hands it to wl-copy.
+            """
+            if self._context_running:
+                self.p.notify_send(
+                    "Copy Context", "A context export is already running."
+                )
+                return
             root_dir = os.path.dirname(clicked_file_path)
-            context_output = []
-            files = self.p.scanner.get_files(root_dir)
+            root = self._root_of(root_dir)
+            files = self.p.cached_files.get(root) if root else None
+            if files is None:
+                if root:
+                    self.p.scan_scheduler.prioritize(root)
+                self.p.notify_send(
+                    "Copy Context", f"{root or root_dir} is still being indexed."
+                )
+                return
+            self._context_running = True
+            self._context_cancel.clear()
+            # The worker filters a snapshot; the cached list changes on the
+            # GTK thread.
+            self.p.run_in_thread(self._export_context, root_dir, list(files), as_file)
 
-            for f_path in files:
-                try:
-                    with open(f_path, "rb") as f:
-                        if b"\x00" in f.read(1024):
-                            continue
-                    with open(f_path, "r", encoding="utf-8", errors="ignore") as f:
-                        content = f.read()
-
-                    header = f"# ==== FILE: {f_path} ====\n"
-                    footer = f"\n# ==== END OF FILE: {f_path} ====\n\n"
-                    context_output.append(f"{header}{content}{footer}")
-                except:
-                    continue
+        def _root_of(self, path):
+            """
+            The configured directory containing path: innermost first, but
+            one whose files are already listed wins over one still scanning.
+            """
+            covering = [
+                root
+                for root in self.p.config_maps.values()
+                if path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+            ]
+            if not covering:
+                return None
+            return max(covering, key=lambda r: (r in self.p.cached_files, len(r)))
 
-            if not context_output:
-                return
-            final_text = "".join(context_output)
+        def _write_file_context(self, out, f_path, budget):
+            """
+            Append one file to out, reading and decoding it in chunks. Returns
+            the number of bytes written, or 0 if the file was skipped.
+            """
+            try:
+                f = open(f_path, "rb")
+            except OSError:
+                return 0
+            with f:
+                head = f.read(CONTEXT_CHUNK)
+                if b"\x00" in head[:1024]:
+                    return 0
+                written = out.write(f"# ==== FILE: {f_path} ====\n".encode("utf-8"))
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+                remaining = min(self.p.context_max_file_bytes, budget)
+                truncated = False
+                chunk = head
+                while chunk:
+                    if len(chunk) > remaining:
+                        chunk = chunk[:remaining]
+                        truncated = True
+                    text = decoder.decode(chunk)
+                    written += out.write(text.encode("utf-8"))
+                    remaining -= len(chunk)
+                    if truncated or not remaining or self._context_cancel.is_set():
+                        truncated = truncated or bool(f.read(1))
+                        break
+                    chunk = f.read(CONTEXT_CHUNK)
+                if truncated:
+                    written += out.write(b"\n# ==== [TRUNCATED] ====")
+                footer = f"\n# ==== END OF FILE: {f_path} ====\n\n"
+                written += out.write(footer.encode("utf-8"))
+            return written
 
-            # Create temporary file
+        def _export_context(self, root_dir, files, as_file):
+            prefix = root_dir.rstrip(os.sep) + os.sep
+            files = [f for f in files if f.startswith(prefix)]
+            total = 0
+            count = 0
+            truncated = False
+            last_report = 0.0
+            tmp_path = None
             try:
                 with tempfile.NamedTemporaryFile(
                     delete=False, suffix=".txt", prefix="waypanel_ctx_"
                 ) as tmp:
-                    tmp.write(final_text.encode("utf-8"))
                     tmp_path = tmp.name
+                    for n, f_path in enumerate(files, 1):
+                        if self._context_cancel.is_set():
+                            count = 0
+                            return
+                        budget = self.p.context_max_total_bytes - total
+                        if budget <= 0:
+                            truncated = True
+                            break
+                        written = self._write_file_context(tmp, f_path, budget)
+                        if written:
+                            total += written
+                            count += 1
+                        now = time.monotonic()
+                        if now - last_report >= 0.25:
+                            last_report = now
+                            self.p.schedule_in_gtk_thread(
+                                self._on_context_progress, n, len(files)
+                            )
+                if not count:
+                    return
+
+                # Clipboard via wl-copy (Wayland native), fed from the file
+                # instead of the command line so the payload size is unbounded.
+                if as_file:
+                    # Copy as a URI list for file managers
+                    subprocess.run(
+                        ["wl-copy", "--type", "text/uri-list"],
+                        input=f"file://{tmp_path}".encode("utf-8"),
+                        timeout=30,
+                    )
+                else:
+                    # Copy as raw text, fed from the file instead of the
+                    # command line so the payload is not bound by ARG_MAX.
+                    with open(tmp_path, "rb") as src:
+                        subprocess.run(["wl-copy"], stdin=src, timeout=30)
+
+                # Clipboard Plugin Sync
+                if not as_file and total <= CLIPBOARD_SYNC_MAX:
+                    with open(tmp_path, "r", encoding="utf-8", errors="ignore") as f:
+                        self.p.schedule_in_gtk_thread(self._sync_clipboard, f.read())
             except Exception as e:
-                self.p.logger.error(f"Tmp file error: {e}")
-                return
+                self.p.logger.error(f"Context export for {root_dir} failed: {e}")
+                count = 0
+            finally:
+                self.p.schedule_in_gtk_thread(
+                    self._on_context_finished, count, total, truncated
+                )
 
-            # Clipboard via wl-copy (Wayland native)
-            if as_file:
-                # Copy as a URI list for file managers
-                self.p.run_cmd(f"wl-copy --type text/uri-list 'file://{tmp_path}'")
-            else:
-                # Copy as raw text
-                self.p.run_cmd(f"wl-copy '{final_text}'")
+        def _on_context_progress(self, done, total):
+            self.p.ui_factory.menubutton.set_tooltip_text(
+                f"Copying context: {done}/{total} files"
+            )
+            return False
+
+        def _on_context_finished(self, count, total, truncated):
+            self._context_running = False
+            self.p.ui_factory.menubutton.set_tooltip_text(None)
+            if count:
+                note = " (size limit reached)" if truncated else ""
+                self.p.notify_send(
+                    "Copy Context",
+                    f"Copied {count} files, {total // 1024} KiB{note}.",
+                )
+            return False
 
-            # Clipboard Plugin Sync
+        def _sync_clipboard(self, text):
             cb_id = "org.waypanel.plugin.clipboard"
             clipboard_plugin = self.p.plugins.get(cb_id)
             if clipboard_plugin and hasattr(clipboard_plugin, "manager"):
-                self.p.run_in_async_task(
-                    clipboard_plugin.manager.server.add_item(final_text)
-                )
+                self.p.run_in_async_task(clipboard_plugin.manager.server.add_item(text))
+            return False
+
+        def cancel_context(self):
+            self._context_cancel.set()
 
         def open_file(self, file_path, index=0, is_dir=False):
             if not file_path:
@@ -109,6 +257,10 @@ def get_launcher_logic():
                 except:
                     pass
 
+            if success and not is_dir:
+                self.p.frecency.record(file_path)
+                self.p.ui_factory.note_opened(file_path)
+
             if success and self.p.popover_openwitheditor:
                 self.p.popover_openwitheditor.popdown()
 
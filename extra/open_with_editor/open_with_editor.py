@@ -17,14 +17,21 @@ def get_plugin_metadata(_):
 
 
 def get_plugin_class():
+    import os
     from src.plugins.core._base import BasePlugin
     from .scanner import get_scanner_logic
     from .launcher import get_launcher_logic
     from .ui import get_ui_factory
+    from .watcher import get_watcher_logic
+    from .frecency import get_frecency_logic
+    from .scheduler import get_scheduler_logic
 
     Scanner = get_scanner_logic()
     Launcher = get_launcher_logic()
     UIFactory = get_ui_factory()
+    DirectoryWatcher = get_watcher_logic()
+    FrecencyStore = get_frecency_logic()
+    ScanScheduler = get_scheduler_logic()
 
     class OpenWithEditor(BasePlugin):
         """
@@ -38,14 +45,14 @@ def get_plugin_class():
                 ["Searchable UI for files with multi-editor launch support."], None
             )
 
-            self.listbox_widgets = {}
-            self.searchbar_widgets = {}
+            self.pages = {}
             self.cached_files = {}
-            self.active_listbox = None
-            self.active_searchbar = None
+            self.watchers = {}
+            self.active_page = None
             self.popover_openwitheditor = None
 
             self.scanner = Scanner(self)
+            self.frecency = FrecencyStore(self)
             self.launcher = Launcher(self)
             self.ui_factory = UIFactory(self)
             self.plugins["css_generator"].install_css("main.css")
@@ -58,12 +65,98 @@ def get_plugin_class():
             self.ui_factory.create_menu_button()
             self.main_widget = (self.ui_factory.menubutton, "append")
 
+            self.scan_scheduler = ScanScheduler(self, self.scan_max_workers)
+            if self.scan_prewarm:
+                self.scan_scheduler.prewarm(self._scan_order())
+
+        def _scan_order(self):
+            """Configured directories, active one first, then most recently used."""
+            active = self.config_maps[self.active_dir_name]
+            others = [p for p in self.config_maps.values() if p != active]
+            others.sort(key=self.frecency.last_used, reverse=True)
+            return [active] + others
+
         def on_enable(self):
             """
             Lifecycle handled by on_start.
             """
             pass
 
+        def on_stop(self):
+            self.launcher.cancel_context()
+            self.scan_scheduler.stop()
+            for watcher in self.watchers.values():
+                watcher.stop()
+            self.watchers.clear()
+
+        def _configured_directories(self):
+            plugin_id = "org.waypanel.plugin.open_with_editor"
+            current_dirs = self.get_root_setting([plugin_id, "directories"], {})
+            return plugin_id, current_dirs
+
+        def add_directory(self, name, path):
+            """
+            Configure a new directory and give it a page right away. Only the
+            new root is scanned; other pages keep their lists.
+            """
+            plugin_id, current_dirs = self._configured_directories()
+            current_dirs[name] = path
+            self.config_handler.update_config([plugin_id, "directories"], current_dirs)
+            self.config_handler.save_config()
+
+            if name in self.config_maps:
+                self._drop_directory(name)
+            root = os.path.expanduser(path)
+            self.config_maps[name] = root
+            self.ui_factory.add_page(name, root)
+            self.scan_scheduler.prioritize(root)
+            self.notify_send(
+                "Directory Added",
+                f"Indexing {root}.",
+                icon="folder-added-symbolic",
+            )
+
+        def remove_directory(self, name):
+            plugin_id, current_dirs = self._configured_directories()
+            if name in current_dirs:
+                del current_dirs[name]
+                self.config_handler.update_config(
+                    [plugin_id, "directories"], current_dirs
+                )
+                self.config_handler.save_config()
+            self._drop_directory(name)
+
+        def _drop_directory(self, name):
+            """Forget everything about one configured directory."""
+            root = self.config_maps.pop(name, None)
+            self.ui_factory.remove_page(name)
+            if root is None or root in self.config_maps.values():
+                return
+            watcher = self.watchers.pop(root, None)
+            if watcher:
+                watcher.stop()
+            self.scan_scheduler.forget(root)
+            self.cached_files.pop(root, None)
+            self.scanner.forget(root)
+            if self.active_dir_name == name and self.config_maps:
+                self.active_dir_name = next(iter(self.config_maps))
+
+        def watch_directory(self, root, dirs=None):
+            """
+            Start keeping the cached file list of root current. Called once
+            the directory has been scanned for the first time; dirs are the
+            directories to watch, looked up in the scanner if not given.
+            """
+            if not self.watch_enabled or root in self.watchers:
+                return
+            watcher = DirectoryWatcher(
+                self, root, self.watch_debounce_ms, self.max_watched_dirs
+            )
+            if dirs is None:
+                dirs = self.scanner.watched_dirs(root)
+            watcher.sync(dirs)
+            self.watchers[root] = watcher
+
         def open_popover(self, *_):
             if not self.popover_openwitheditor:
                 self.ui_factory.create_popover()
@@ -71,8 +164,6 @@ def get_plugin_class():
             if self.popover_openwitheditor.is_visible():
                 self.popover_openwitheditor.popdown()
             else:
-                if self.active_listbox:
-                    self.active_listbox.unselect_all()
                 self.popover_openwitheditor.popup()
 
     return OpenWithEditor
@@ -1,65 +1,256 @@
 def get_scanner_logic():
     import os
-    import fnmatch
+    import marshal
+    import hashlib
+    import threading
+    from .gitignore import get_gitignore_logic
+
+    GitignoreEngine, IgnoreStack = get_gitignore_logic()
+
+    # Bump when the on-disk layout of the tree cache changes.
+    CACHE_VERSION = 2
 
     class FileScanner:
+        """
+        Lists the files of a configured directory.
+
+        For every walked directory the scanner remembers its mtime, the
+        mtime of its .gitignore and its filtered entries. The state is
+        persisted per root, so after a restart only directories whose mtime
+        changed are listed again; the rest costs a single stat each. While
+        the plugin runs, a DirectoryWatcher keeps the cached list current
+        through compute_changes.
+
+        Walks run in worker threads (scheduler scans, watcher updates) and
+        hold a lock of their root only, so different roots are walked in
+        parallel. A walk builds a new tree and swaps it in at the end, which
+        lets watched_dirs and forget run without a lock; the GTK thread
+        never waits for a walk. The plugin's cached lists are never modified
+        here; callers publish results on the GTK thread.
+        """
+
         def __init__(self, plugin):
             self.p = plugin
+            self.gitignore = GitignoreEngine()
+            self.trees = {}
+            self._locks = {}
+            self._locks_guard = threading.Lock()
+
+        def _lock_for(self, root):
+            with self._locks_guard:
+                return self._locks.setdefault(root, threading.Lock())
+
+        def _cache_path(self, root):
+            digest = hashlib.sha1(root.encode("utf-8")).hexdigest()[:16]
+            return os.path.join(
+                self.p._path_handler.get_data_path(),
+                "open_with_editor",
+                "file_cache",
+                f"{digest}.bin",
+            )
+
+        def _load_tree(self, root):
+            try:
+                with open(self._cache_path(root), "rb") as f:
+                    data = marshal.load(f)
+                if data.get("version") == CACHE_VERSION and data.get("root") == root:
+                    return data["dirs"]
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                self.p.logger.warning(f"Discarding file cache for {root}: {e}")
+            return {}
+
+        def _save_tree(self, root, tree):
+            path = self._cache_path(root)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    marshal.dump(
+                        {"version": CACHE_VERSION, "root": root, "dirs": tree}, f
+                    )
+                os.replace(tmp_path, path)
+            except Exception as e:
+                self.p.logger.warning(f"Could not save file cache for {root}: {e}")
+
+        @staticmethod
+        def _gitignore_mtime(directory):
+            try:
+                return os.stat(os.path.join(directory, ".gitignore")).st_mtime_ns
+            except OSError:
+                return 0
 
-        def load_gitignore(self, directory):
-            path = os.path.join(directory, ".gitignore")
-            patterns = []
-            if os.path.exists(path):
+        def _list_dir(self, current, ignores):
+            """
+            Return the (subdirs, files) names of current that are neither
+            hidden nor ignored.
+            """
+            subdirs, files = [], []
+            try:
+                with os.scandir(current) as it:
+                    entries = list(it)
+            except OSError as e:
+                self.p.logger.warning(f"Cannot scan {current}: {e}")
+                return subdirs, files
+
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
                 try:
-                    with open(path, "r") as f:
-                        patterns = [
-                            l.strip() for l in f if l.strip() and not l.startswith("#")
-                        ]
-                except Exception as e:
-                    self.p.logger.warning(f"Error reading .gitignore: {e}")
-            return patterns
-
-        def is_ignored(self, relative_path, patterns):
-            for pattern in patterns:
-                if fnmatch.fnmatch(relative_path, pattern):
-                    return True
-                if fnmatch.fnmatch(os.path.basename(relative_path), pattern):
-                    return True
-                if pattern.endswith("/") and fnmatch.fnmatch(
-                    relative_path + "/", pattern
-                ):
-                    return True
-            return False
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if not is_dir and entry.is_symlink() and entry.is_dir():
+                        # Like os.walk, symlinked directories are not
+                        # followed; a link to an ancestor would loop.
+                        continue
+                except OSError:
+                    continue
+                if ignores.levels and ignores.is_ignored(entry.path, is_dir):
+                    continue
+                (subdirs if is_dir else files).append(entry.name)
+            return subdirs, files
 
-        def get_files(self, directory):
-            if directory in self.p.cached_files:
-                return self.p.cached_files[directory]
+        def _refresh_tree(self, root, top=None):
+            """
+            Validate the remembered tree of root (or only the subtree at top)
+            against the disk and return (files, changed), where files are the
+            files below top. Directories with an unchanged mtime and
+            .gitignore are reused; a changed .gitignore re-lists its subtree.
+            """
+            top = top or root
+            tree = self.trees.get(root)
+            if tree is None:
+                tree = self._load_tree(root)
 
+            if top == root:
+                top_rel, ignores = "", IgnoreStack()
+                new_tree = {}
+            else:
+                top_rel = os.path.relpath(top, root)
+                ignores = self.gitignore.stack_for(root, os.path.dirname(top))
+                prefix = top_rel + os.sep
+                new_tree = {
+                    rel: state
+                    for rel, state in tree.items()
+                    if rel != top_rel and not rel.startswith(prefix)
+                }
+            kept = len(new_tree)
             files = []
-            if not os.path.isdir(directory):
-                return files
-
-            patterns = self.load_gitignore(directory)
-            for root, dirnames, filenames in os.walk(directory):
-                rel_root = os.path.relpath(root, directory)
-                if rel_root == ".":
-                    rel_root = ""
-
-                dirnames[:] = [
-                    d
-                    for d in dirnames
-                    if not d.startswith(".")
-                    and not self.is_ignored(os.path.join(rel_root, d), patterns)
-                ]
-
-                for f in filenames:
-                    if f.startswith("."):
+            changed = False
+
+            stack = [(top, top_rel, ignores, False)]
+            while stack:
+                current, rel, ignores, force = stack.pop()
+                try:
+                    dir_mtime = os.stat(current).st_mtime_ns
+                except OSError:
+                    changed = True
+                    continue
+
+                cached = tree.get(rel)
+                reuse = False
+                if cached is not None and not force and cached[0] == dir_mtime:
+                    # A .gitignore can only appear by changing the directory
+                    # mtime, so it only needs a stat when one was seen before.
+                    gi_mtime = self._gitignore_mtime(current) if cached[1] else 0
+                    reuse = gi_mtime == cached[1]
+                else:
+                    gi_mtime = self._gitignore_mtime(current)
+
+                if gi_mtime:
+                    ignores = ignores.push(self.gitignore.load(current, gi_mtime))
+                if reuse:
+                    subdirs, names = cached[2], cached[3]
+                else:
+                    changed = True
+                    if cached is not None and cached[1] != gi_mtime:
+                        force = True
+                    subdirs, names = self._list_dir(current, ignores)
+
+                new_tree[rel] = (dir_mtime, gi_mtime, subdirs, names)
+                files.extend(os.path.join(current, name) for name in names)
+                for name in reversed(subdirs):
+                    stack.append(
+                        (
+                            os.path.join(current, name),
+                            os.path.join(rel, name) if rel else name,
+                            ignores,
+                            force,
+                        )
+                    )
+
+            if len(new_tree) != len(tree) or (top != root and len(new_tree) == kept):
+                changed = True
+            self.trees[root] = new_tree
+            return files, changed
+
+        def watched_dirs(self, root):
+            """Absolute paths of every directory in the remembered tree of root."""
+            rels = list(self.trees.get(root, ()))
+            return [os.path.join(root, rel) if rel else root for rel in rels]
+
+        def forget(self, root):
+            self.trees.pop(root, None)
+
+        def compute_changes(self, root, files, dirs):
+            """
+            Re-validate the given directories of root and return files, the
+            current list of root, patched accordingly, or None if nothing
+            changed. Worker-safe; the caller publishes the result.
+            """
+            # Refreshing a directory covers its whole subtree.
+            tops = []
+            for path in sorted(set(dirs)):
+                if not any(path.startswith(t.rstrip(os.sep) + os.sep) for t in tops):
+                    tops.append(path)
+
+            any_changed = False
+            with self._lock_for(root):
+                for top in tops:
+                    if top != root and not os.path.isdir(os.path.dirname(top)):
+                        continue
+                    sub_files, changed = self._refresh_tree(root, top)
+                    if not changed:
+                        continue
+                    any_changed = True
+                    if top == root:
+                        files = sub_files
                         continue
-                    rel_f = os.path.join(rel_root, f)
-                    if not self.is_ignored(rel_f, patterns):
-                        files.append(os.path.join(root, f))
+                    prefix = top.rstrip(os.sep) + os.sep
+                    files = [f for f in files if not f.startswith(prefix)] + sub_files
 
+                if any_changed:
+                    self._save_tree(root, self.trees[root])
+            return files if any_changed else None
+
+        def scan(self, directory):
+            """
+            Walk directory and persist its tree. Does not touch the plugin's
+            cached lists, so it can run in a worker thread.
+            """
+            with self._lock_for(directory):
+                files, changed = self._refresh_tree(directory)
+                if changed:
+                    self._save_tree(directory, self.trees[directory])
+            return files
+
+        def adopt(self, directory, files, dirs=None):
+            """
+            Publish a scanned list and keep it current from now on. dirs are
+            the watched_dirs of the scan, if the caller already has them.
+            """
             self.p.cached_files[directory] = files
+            if directory in self.p.config_maps.values():
+                self.p.watch_directory(directory, dirs)
+
+        def get_files(self, directory):
+            if directory in self.p.cached_files:
+                return self.p.cached_files[directory]
+            if not os.path.isdir(directory):
+                return []
+
+            files = self.scan(directory)
+            self.adopt(directory, files)
             return files
 
     return FileScanner
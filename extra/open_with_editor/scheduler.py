@@ -0,0 +1,102 @@
+def get_scheduler_logic():
+    import os
+
+    PENDING, SCANNING, READY = "pending", "scanning", "ready"
+
+    class ScanScheduler:
+        """
+        Scans the configured directories in the background.
+
+        Directories wait in a priority queue: the visible page first, then
+        the most recently used ones. At most max_workers scans run at a time.
+        A finished scan is adopted by the scanner on the GTK thread and
+        reported to the UI, so showing a page never waits for the disk. A
+        failed scan leaves the directory unscanned, to be retried when its
+        page is opened again.
+        """
+
+        def __init__(self, plugin, max_workers=2):
+            self.p = plugin
+            self.max_workers = max(1, max_workers)
+            self.state = {}
+            self._queue = []
+            self._running = 0
+            self._stopped = False
+
+        def is_ready(self, root):
+            return self.state.get(root) == READY
+
+        def prewarm(self, roots):
+            """Queue every root that is not known yet, in the given order."""
+            for root in roots:
+                if root not in self.state:
+                    self.state[root] = PENDING
+                    self._queue.append(root)
+            self._pump()
+
+        def prioritize(self, root):
+            """Move root to the front of the queue, queueing it if needed."""
+            state = self.state.get(root)
+            if state in (SCANNING, READY):
+                return
+            if state == PENDING:
+                self._queue.remove(root)
+            self.state[root] = PENDING
+            self._queue.insert(0, root)
+            self._pump()
+
+        def forget(self, root):
+            """Drop root, e.g. after its directory was removed from the config."""
+            if self.state.pop(root, None) == PENDING:
+                self._queue.remove(root)
+
+        def _pump(self):
+            while (
+                not self._stopped and self._queue and self._running < self.max_workers
+            ):
+                root = self._queue.pop(0)
+                self.state[root] = SCANNING
+                self._running += 1
+                self.p.run_in_thread(self._scan, root)
+
+        def _scan(self, root):
+            files, dirs, prepared, error = [], None, None, None
+            try:
+                if not os.path.isdir(root):
+                    raise FileNotFoundError(f"{root} is not a directory")
+                files = self.p.scanner.scan(root)
+                dirs = self.p.scanner.watched_dirs(root)
+                prepared = self.p.ui_factory.prepare_directory(root, files)
+            except Exception as e:
+                error = e
+            self.p.schedule_in_gtk_thread(
+                self._on_scanned, root, files, dirs, prepared, error
+            )
+
+        def _on_scanned(self, root, files, dirs, prepared, error):
+            self._running -= 1
+            if self._stopped:
+                return False
+            if root not in self.state:
+                # Dropped while scanning; the walk put its tree back.
+                self.p.scanner.forget(root)
+                self._pump()
+                return False
+            if error is not None:
+                # Back to unscanned: the next open queues it again instead
+                # of showing an empty list for good.
+                self.p.logger.error(f"Scanning {root} failed: {error}")
+                del self.state[root]
+                self.p.ui_factory.on_directory_failed(root)
+            else:
+                self.state[root] = READY
+                self.p.scanner.adopt(root, files, dirs)
+                self.p.ui_factory.on_directory_ready(root, prepared)
+            self._pump()
+            return False
+
+        def stop(self):
+            self._stopped = True
+            self._queue.clear()
+
+    return ScanScheduler
@@ -3,11 +3,91 @@
 
 def get_ui_factory():
     import os
+    from bisect import bisect_left
     from gi.repository import Gdk, Gio
+    from .fuzzy import get_fuzzy_logic
+
+    FuzzyMatcher = get_fuzzy_logic()
+
+    # Seconds of ranking work per main loop iteration, to stay within a frame.
+    SEARCH_SLICE = 0.012
+
+    class IconCache:
+        """
+        Memoizes the GIcon shown for a file. Guessing only looks at the name,
+        so icons are cached per extension, and per basename for files without
+        one (Makefile, LICENSE, ...). Only the first file of each kind
+        touches the shared-mime database.
+        """
+
+        def __init__(self):
+            self._by_extension = {}
+            self._by_name = {}
+            self._by_content_type = {}
+
+        def _icon_for_name(self, name):
+            content_type = Gio.content_type_guess(name, None)[0]
+            icon = self._by_content_type.get(content_type)
+            if icon is None:
+                icon = Gio.content_type_get_icon(content_type)
+                self._by_content_type[content_type] = icon
+            return icon
+
+        def lookup(self, path):
+            name = os.path.basename(path)
+            dot = name.rfind(".")
+            if dot > 0:
+                ext = name[dot:].lower()
+                icon = self._by_extension.get(ext)
+                if icon is None:
+                    icon = self._by_extension[ext] = self._icon_for_name(name)
+                return icon
+            icon = self._by_name.get(name)
+            if icon is None:
+                icon = self._by_name[name] = self._icon_for_name(name)
+            return icon
+
+    class FileListPage:
+        """
+        The list models of one stack page. The full file list and the
+        ranked results of the current query are separate StringLists; the
+        selection is pointed at whichever one is shown, and a virtualized
+        ListView only builds widgets for the visible rows.
+        """
+
+        def __init__(self, gtk, name, search_entry):
+            self.name = name
+            self.search_entry = search_entry
+            self.stale = True
+            self.reorder = False
+            self.matcher = None
+            # Frecent files currently at the top of store, or None when
+            # store does not show matcher yet.
+            self.head = None
+            self.search = None
+            self.store = gtk.StringList.new([])
+            self.results = gtk.StringList.new([])
+            self.selection = gtk.SingleSelection.new(self.store)
+            self.view = gtk.ListView.new(self.selection, None)
+
+        def show_all(self):
+            if self.selection.get_model() is not self.store:
+                self.selection.set_model(self.store)
+
+        def show_results(self, paths):
+            self.results.splice(0, self.results.get_n_items(), paths)
+            if self.selection.get_model() is not self.results:
+                self.selection.set_model(self.results)
+
+        def selected_path(self):
+            item = self.selection.get_selected_item()
+            return item.get_string() if item else None
 
     class UIFactory:
         def __init__(self, plugin):
             self.p = plugin
+            self._search_source = None
+            self.icons = IconCache()
 
         def create_menu_button(self):
             self.menubutton = self.p.gtk.Button()
@@ -77,72 +157,84 @@ def get_ui_factory():
             self.ctx_menu.add_css_class("openwitheditor-context-menu")
             self.ctx_menu.set_autohide(True)
 
-            plugin_id = "org.waypanel.plugin.open_with_editor"
-
             for name, path in self.p.config_maps.items():
-                page = self.p.gtk.Box.new(self.p.gtk.Orientation.VERTICAL, 0)
-                page.add_css_class("openwitheditor-page-box")
-
-                # --- Path Management Row ---
-                mgmt_row = self.p.gtk.Box(orientation=self.p.gtk.Orientation.HORIZONTAL)
-                mgmt_row.set_margin_start(10)
-                mgmt_row.set_margin_end(10)
-                mgmt_row.set_margin_top(8)
-
-                path_lbl = self.p.gtk.Label(label=f"Source: {path}")
-                path_lbl.set_hexpand(True)
-                path_lbl.set_halign(self.p.gtk.Align.START)
-                path_lbl.add_css_class("caption")
-                path_lbl.set_ellipsize(self.p.pango.EllipsizeMode.END)
-
-                del_btn = self.p.gtk.Button(icon_name="edit-delete-symbolic")
-                del_btn.add_css_class("destructive-action")
-                del_btn.set_has_frame(False)
-
-                # Targeting the root configuration structure
-                def on_del_clicked(_, n=name):
-                    current_dirs = self.p.get_root_setting(
-                        [plugin_id, "directories"], {}
-                    )
-                    if n in current_dirs:
-                        del current_dirs[n]
-                        self.p.config_handler.update_config(
-                            [plugin_id, "directories"], current_dirs
-                        )
-                        self.p.config_handler.save_config()
-
-                del_btn.connect("clicked", on_del_clicked)
-                mgmt_row.append(path_lbl)
-                mgmt_row.append(del_btn)
-                page.append(mgmt_row)
-
-                # --- Search and List ---
-                search_entry = self.p.gtk.SearchEntry.new()
-                search_entry.add_css_class("openwitheditor-search-entry")
-                search_entry.connect("search-changed", self.on_search_changed)
-                search_entry.connect("activate", self.on_search_activated)
-
-                scrolled = self.p.gtk.ScrolledWindow.new()
-                scrolled.set_policy(
-                    self.p.gtk.PolicyType.NEVER, self.p.gtk.PolicyType.AUTOMATIC
-                )
-                scrolled.set_propagate_natural_height(False)
-                scrolled.set_vexpand(True)
-
-                listbox = self.p.gtk.ListBox.new()
-                listbox.add_css_class("openwitheditor-listbox")
-                listbox.connect("row-activated", self.on_activated)
-
-                scrolled.set_child(listbox)
-                page.append(search_entry)
-                page.append(scrolled)
-
-                self.p.stack.add_titled(page, name, name)
-                self.p.listbox_widgets[name] = listbox
-                self.p.searchbar_widgets[name] = search_entry
+                self._add_page(name, path)
 
             self.p.popover_openwitheditor.set_child(main_layout)
 
+        def _add_page(self, name, path):
+            """Build the stack page of one configured directory."""
+            page = self.p.gtk.Box.new(self.p.gtk.Orientation.VERTICAL, 0)
+            page.add_css_class("openwitheditor-page-box")
+
+            # --- Path Management Row ---
+            mgmt_row = self.p.gtk.Box(orientation=self.p.gtk.Orientation.HORIZONTAL)
+            mgmt_row.set_margin_start(10)
+            mgmt_row.set_margin_end(10)
+            mgmt_row.set_margin_top(8)
+
+            path_lbl = self.p.gtk.Label(label=f"Source: {path}")
+            path_lbl.set_hexpand(True)
+            path_lbl.set_halign(self.p.gtk.Align.START)
+            path_lbl.add_css_class("caption")
+            path_lbl.set_ellipsize(self.p.pango.EllipsizeMode.END)
+
+            del_btn = self.p.gtk.Button(icon_name="edit-delete-symbolic")
+            del_btn.add_css_class("destructive-action")
+            del_btn.set_has_frame(False)
+
+            del_btn.connect("clicked", lambda *_: self.p.remove_directory(name))
+            mgmt_row.append(path_lbl)
+            mgmt_row.append(del_btn)
+            page.append(mgmt_row)
+
+            # --- Search and List ---
+            search_entry = self.p.gtk.SearchEntry.new()
+            search_entry.add_css_class("openwitheditor-search-entry")
+            search_entry.connect("search-changed", self.on_search_changed)
+            search_entry.connect("activate", self.on_search_activated)
+            key_controller = self.p.gtk.EventControllerKey.new()
+            key_controller.connect("key-pressed", self.on_key_pressed)
+            search_entry.add_controller(key_controller)
+
+            scrolled = self.p.gtk.ScrolledWindow.new()
+            scrolled.set_policy(
+                self.p.gtk.PolicyType.NEVER, self.p.gtk.PolicyType.AUTOMATIC
+            )
+            scrolled.set_propagate_natural_height(False)
+            scrolled.set_vexpand(True)
+
+            list_page = FileListPage(self.p.gtk, name, search_entry)
+            list_page.view.add_css_class("openwitheditor-listview")
+            list_page.view.set_factory(self._create_factory(name))
+            list_page.view.connect("activate", self.on_activated)
+
+            scrolled.set_child(list_page.view)
+            page.append(search_entry)
+            page.append(scrolled)
+
+            list_page.widget = page
+            self.p.stack.add_titled(page, name, name)
+            self.p.pages[name] = list_page
+
+        def _remove_page(self, name):
+            list_page = self.p.pages.pop(name, None)
+            if list_page is None:
+                return
+            if self.p.active_page is list_page:
+                self.p.active_page = None
+            self.p.stack.remove(list_page.widget)
+
+        def add_page(self, name, path):
+            """Add the page of a directory configured at runtime."""
+            if self.p.popover_openwitheditor is None:
+                return  # create_popover builds it from config_maps
+            self._add_page(name, path)
+
+        def remove_page(self, name):
+            if self.p.popover_openwitheditor is not None:
+                self._remove_page(name)
+
         def _on_add_directory_clicked(self, _):
             from gi.repository import Adw
 
@@ -173,21 +265,7 @@ def get_ui_factory():
                         path_entry.get_text().strip(),
                     )
                     if name and path:
-                        current_dirs = self.p.get_root_setting(
-                            ["org.waypanel.plugin.open_with_editor", "directories"], {}
-                        )
-                        current_dirs[name] = path
-                        self.p.config_handler.update_config(
-                            ["org.waypanel.plugin.open_with_editor", "directories"],
-                            current_dirs,
-                        )
-                        self.p.config_handler.save_config()
-
-                        self.p.notify_send(
-                            "Directory Added",
-                            "Configuration updated. Please reload the plugin or panel to index the new directory.",
-                            icon="folder-added-symbolic",
-                        )
+                        self.p.add_directory(name, path)
                 d.destroy()
 
             dialog.connect("response", on_response)
@@ -199,62 +277,182 @@ def get_ui_factory():
             )
 
             def _deferred_load():
+                if not self.p.config_maps:
+                    return False
                 name = self.p.stack.get_visible_child_name()
                 if not name or name not in self.p.config_maps:
                     name = next(iter(self.p.config_maps))
                     self.p.stack.set_visible_child_name(name)
 
                 self.p.active_dir_name = name
-                active_path = self.p.config_maps[name]
-                self.p.active_listbox = self.p.listbox_widgets[name]
-                self.p.active_searchbar = self.p.searchbar_widgets[name]
-                self.p.active_searchbar.grab_focus()
-
-                files = self.p.scanner.get_files(active_path)
-                while child_row := self.p.active_listbox.get_first_child():
-                    self.p.active_listbox.remove(child_row)
-
-                for f in files:
-                    row_content = self._create_row(f, active_path)
-                    row = self.p.gtk.ListBoxRow.new()
-                    row.set_child(row_content)
-
-                    gesture = self.p.gtk.GestureClick.new()
-                    gesture.set_button(0)
-                    gesture.connect(
-                        "pressed",
-                        lambda g, n, x, y, r=row: self.on_click(g, n, x, y, r),
-                    )
-                    row.add_controller(gesture)
-                    self.p.active_listbox.append(row)
-
-                self.p.active_listbox.set_filter_func(self.filter_func)
-                self._select_first_visible()
+                self.p.active_page = self.p.pages[name]
+                self.p.active_page.search_entry.grab_focus()
+
+                root = self.p.config_maps[name]
+                page = self.p.active_page
+                if not self.p.scan_scheduler.is_ready(root):
+                    # Filled in by on_directory_ready once the scan is done.
+                    page.search_entry.set_placeholder_text("Scanning…")
+                    self.p.scan_scheduler.prioritize(root)
+                    return False
+
+                # The models outlive the popover; only a changed file list
+                # has to be handed over again.
+                if page.stale:
+                    self._populate(page, root)
+                elif page.reorder:
+                    self._arrange(page, root)
+                self._select_position(0)
                 return False
 
             self.p.glib.timeout_add(50, _deferred_load)
 
-        def _create_row(self, path, base_dir):
+        def _populate(self, page, root, matcher=None):
+            if matcher is None:
+                matcher = FuzzyMatcher(self.p.scanner.get_files(root), root)
+            page.matcher = matcher
+            page.stale = False
+            page.head = None
+            self._arrange(page, root)
+            if page.search_entry.get_text():
+                self.on_search_changed(page.search_entry)
+
+        def prepare_directory(self, root, files):
+            """Build the search structures of a scanned list; runs in a worker."""
+            return FuzzyMatcher(files, root)
+
+        def on_directory_ready(self, root, matcher):
+            """Take over a list scanned in the background."""
+            popover = self.p.popover_openwitheditor
+            for name, page in self.p.pages.items():
+                if self.p.config_maps.get(name) != root:
+                    continue
+                page.search_entry.set_placeholder_text("")
+                if matcher is None:
+                    page.stale = True
+                elif page is self.p.active_page and popover and popover.is_visible():
+                    self._populate(page, root, matcher)
+                    self._select_position(0)
+                else:
+                    page.matcher = matcher
+                    page.stale = False
+                    page.head = None
+                    page.reorder = True
+
+        def on_directory_failed(self, root):
+            """A background scan failed; it is retried when the page opens."""
+            for name, page in self.p.pages.items():
+                if self.p.config_maps.get(name) == root:
+                    page.search_entry.set_placeholder_text("Directory unavailable")
+
+        def _arrange(self, page, root):
+            """
+            Fill the unfiltered list, most frecent files first. Once the
+            store shows the page's matcher, only the rows of files entering
+            or leaving the frecent head are moved.
+            """
+            known = page.matcher.index_of()
+            frecent = [f for f in self.p.frecency.ranked(root) if f in known]
+            if page.head is None:
+                files = page.matcher.paths
+                if frecent:
+                    seen = set(frecent)
+                    files = frecent + [f for f in files if f not in seen]
+                page.store.splice(0, page.store.get_n_items(), files)
+            elif frecent != page.head:
+                self._move_head(page.store, page.head, frecent, known)
+            page.head = frecent
+            page.reorder = False
+
+        @staticmethod
+        def _move_head(store, old, new, known):
+            """
+            Replace the head old of store by new. Below the head the store
+            keeps the matcher's order, so every file entering or leaving the
+            head is spliced at its position there.
+            """
+            store.splice(0, len(old), [])
+            old_set, new_set = set(old), set(new)
+            old_positions = sorted(known[f] for f in old)
+            new_positions = sorted(known[f] for f in new)
+            # Back to front, so earlier removals do not shift later ones.
+            for i in sorted((known[f] for f in new if f not in old_set), reverse=True):
+                store.remove(i - bisect_left(old_positions, i))
+            for f in sorted((f for f in old if f not in new_set), key=known.get):
+                i = known[f]
+                store.splice(i - bisect_left(new_positions, i), 0, [f])
+            store.splice(0, 0, new)
+
+        def note_opened(self, path):
+            """Re-sort the unfiltered lists containing path on their next open."""
+            for name, page in self.p.pages.items():
+                root = self.p.config_maps.get(name)
+                if root and path.startswith(root.rstrip(os.sep) + os.sep):
+                    page.reorder = True
+
+        def refresh_directory(self, root, matcher):
+            """Hand the changed file list of root, prepared in a worker, to its page."""
+            for name, page in self.p.pages.items():
+                if self.p.config_maps.get(name) != root:
+                    continue
+                popover = self.p.popover_openwitheditor
+                if page is self.p.active_page and popover and popover.is_visible():
+                    self._populate(page, root, matcher)
+                    self._select_position(0)
+                else:
+                    page.matcher = matcher
+                    page.stale = False
+                    page.head = None
+                    page.reorder = True
+
+        def _create_factory(self, name):
+            """
+            Row factory of one page. Rows are only built for the visible part
+            of the list and are recycled while scrolling.
+            """
+            factory = self.p.gtk.SignalListItemFactory()
+            factory.connect("setup", self._on_item_setup)
+            factory.connect("bind", self._on_item_bind, name)
+            return factory
+
+        def _on_item_setup(self, _factory, list_item):
             row_hbox = self.p.gtk.Box.new(self.p.gtk.Orientation.HORIZONTAL, 0)
             row_hbox.add_css_class("openwitheditor-row-hbox")
-            row_hbox.MYTEXT = path
+            row_hbox.file_path = None
 
-            content_type = Gio.content_type_guess(path, None)[0]
-            icon = Gio.content_type_get_icon(content_type)
-            image = self.p.gtk.Image.new_from_gicon(icon)
+            image = self.p.gtk.Image.new()
             image.add_css_class("openwitheditor-icon-from-popover")
 
-            label = self.p.gtk.Label.new(os.path.relpath(path, base_dir))
+            label = self.p.gtk.Label.new("")
             label.add_css_class("openwitheditor-label-from-popover")
             label.set_halign(self.p.gtk.Align.START)
 
+            gesture = self.p.gtk.GestureClick.new()
+            gesture.set_button(0)
+            gesture.connect(
+                "pressed", lambda g, n, x, y, r=row_hbox: self.on_click(g, n, x, y, r)
+            )
+            row_hbox.add_controller(gesture)
+
             row_hbox.append(image)
             row_hbox.append(label)
-            return row_hbox
+            list_item.set_child(row_hbox)
+
+        def _on_item_bind(self, _factory, list_item, name):
+            path = list_item.get_item().get_string()
+            row_hbox = list_item.get_child()
+            row_hbox.file_path = path
+            image = row_hbox.get_first_child()
+            label = image.get_next_sibling()
+
+            image.set_from_gicon(self.icons.lookup(path))
+            label.set_text(os.path.relpath(path, self.p.config_maps.get(name, "/")))
 
         def on_click(self, gesture, n_press, x, y, row):
             btn = gesture.get_current_button()
-            file_path = row.get_child().MYTEXT
+            file_path = row.file_path
+            if not file_path:
+                return
             if btn == 3:
                 self._show_context_menu(row, x, y, file_path)
             elif btn == 1:
@@ -309,29 +507,56 @@ def get_ui_factory():
             self.ctx_menu.popup()
 
         def on_search_changed(self, entry):
-            self.p.active_listbox.invalidate_filter()
-            self.p.glib.idle_add(self._select_first_visible)
-
-        def _select_first_visible(self):
-            child = self.p.active_listbox.get_first_child()
-            while child:
-                if child.is_visible():
-                    self.p.active_listbox.select_row(child)
-                    break
-                child = child.get_next_sibling()
+            page = self.p.active_page
+            if page is None or page.search_entry is not entry:
+                return
+            if self._search_source is not None:
+                self.p.glib.source_remove(self._search_source)
+                self._search_source = None
+
+            query = entry.get_text()
+            if not query.strip() or page.matcher is None:
+                page.search = None
+                page.show_all()
+                self._select_position(0)
+                return
+
+            boost = self.p.frecency.boosts(self.p.config_maps.get(page.name, "/"))
+            page.search = page.matcher.search(query, self.p.max_results, boost)
+            if self._continue_search(page):
+                self._search_source = self.p.glib.idle_add(self._continue_search, page)
+
+        def _continue_search(self, page):
+            """Run one slice of the page's search; publish it once finished."""
+            search = page.search
+            if search is None:
+                self._search_source = None
+                return False
+            if not search.step(SEARCH_SLICE):
+                return True
+            self._search_source = None
+            page.search = None
+            page.show_results(search.results)
+            self._select_position(0)
+            return False
 
-        def filter_func(self, row):
-            query = self.p.active_searchbar.get_text().lower()
-            return not query or query in row.get_child().MYTEXT.lower()
+        def _select_position(self, position):
+            page = self.p.active_page
+            if page is None or not page.selection.get_n_items():
+                return False
+            page.selection.set_selected(position)
+            page.view.scroll_to(position, self.p.gtk.ListScrollFlags.NONE, None)
+            return False
 
         def on_search_activated(self, entry):
-            selected = self.p.active_listbox.get_selected_row()
-            if selected and selected.is_visible():
-                self.on_activated(self.p.active_listbox, selected)
+            page = self.p.active_page
+            if page is not None and page.selected_path():
+                self.p.launcher.open_file(page.selected_path(), 0)
 
-        def on_activated(self, lb, row):
-            if row:
-                self.p.launcher.open_file(row.get_child().MYTEXT, 0)
+        def on_activated(self, view, position):
+            item = view.get_model().get_item(position)
+            if item:
+                self.p.launcher.open_file(item.get_string(), 0)
 
         def on_closed(self, *_):
             self.p.layer_shell.set_keyboard_mode(
@@ -339,27 +564,21 @@ def get_ui_factory():
             )
 
         def on_key_pressed(self, controller, keyval, keycode, state):
-            from gi.repository import Gdk
-
+            page = self.p.active_page
+            if page is None:
+                return False
+            position = page.selection.get_selected()
+            count = page.selection.get_n_items()
             if keyval == Gdk.KEY_Up:
-                row = self.p.active_listbox.get_selected_row()
-                self._select_visible_row((row.get_index() if row else 0) - 1, True)
+                if position != self.p.gtk.INVALID_LIST_POSITION and position > 0:
+                    self._select_position(position - 1)
                 return True
             elif keyval == Gdk.KEY_Down:
-                row = self.p.active_listbox.get_selected_row()
-                self._select_visible_row((row.get_index() if row else -1) + 1, False)
+                if position == self.p.gtk.INVALID_LIST_POSITION:
+                    self._select_position(0)
+                elif position + 1 < count:
+                    self._select_position(position + 1)
                 return True
             return False
 
-        def _select_visible_row(self, start_index, reverse):
-            while True:
-                row = self.p.active_listbox.get_row_at_index(start_index)
-                if not row:
-                    break
-                if row.is_visible():
-                    self.p.active_listbox.select_row(row)
-                    self.p.active_searchbar.grab_focus()
-                    break
-                start_index = start_index - 1 if reverse else start_index + 1
-
     return UIFactory
@@ -0,0 +1,137 @@
+def get_watcher_logic():
+    import os
+    from gi.repository import Gio  # pyright: ignore
+
+    RELEVANT_EVENTS = {
+        Gio.FileMonitorEvent.CREATED,
+        Gio.FileMonitorEvent.DELETED,
+        Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+        Gio.FileMonitorEvent.MOVED_IN,
+        Gio.FileMonitorEvent.MOVED_OUT,
+        Gio.FileMonitorEvent.RENAMED,
+    }
+
+    class DirectoryWatcher:
+        """
+        Keeps the cached file list of one configured directory current.
+
+        Every directory of the scanned tree gets a Gio.FileMonitor. Events
+        only mark the directory that contains the changed entry as dirty;
+        after debounce_ms the dirty directories are re-validated by the
+        scanner in a worker thread, which also prepares the page's search
+        structures. Both are published on the GTK thread. One update runs at a time; events arriving meanwhile
+        are flushed after it.
+        """
+
+        def __init__(self, plugin, root, debounce_ms=500, max_dirs=4096):
+            self.p = plugin
+            self.root = root
+            self.debounce_ms = debounce_ms
+            self.max_dirs = max_dirs
+            self.monitors = {}
+            self._dirty = set()
+            self._timer_id = None
+            self._limit_warned = False
+            self._busy = False
+            self._stopped = False
+
+        def sync(self, dirs):
+            """Watch exactly the given directories, up to max_dirs."""
+            wanted = set(dirs)
+            for path in list(self.monitors):
+                if path not in wanted:
+                    self.monitors.pop(path).cancel()
+
+            # Shallow directories first, so the cap drops the deepest ones.
+            for path in sorted(wanted, key=lambda d: d.count(os.sep)):
+                if path in self.monitors:
+                    continue
+                if len(self.monitors) >= self.max_dirs:
+                    if not self._limit_warned:
+                        self._limit_warned = True
+                        self.p.logger.warning(
+                            f"Watch limit of {self.max_dirs} directories reached "
+                            f"for {self.root}; deeper changes show up after a restart."
+                        )
+                    break
+                try:
+                    monitor = Gio.File.new_for_path(path).monitor_directory(
+                        Gio.FileMonitorFlags.WATCH_MOVES, None
+                    )
+                except Exception as e:
+                    self.p.logger.warning(f"Cannot watch {path}: {e}")
+                    continue
+                monitor.connect("changed", self._on_changed)
+                self.monitors[path] = monitor
+
+        def _on_changed(self, _monitor, gfile, other_file, event_type):
+            if event_type not in RELEVANT_EVENTS:
+                return
+            # Content changes of watched files do not alter the listing,
+            # but an edited .gitignore does.
+            if (
+                event_type == Gio.FileMonitorEvent.CHANGES_DONE_HINT
+                and gfile.get_basename() != ".gitignore"
+            ):
+                return
+
+            for f in (gfile, other_file):
+                path = f.get_path() if f is not None else None
+                if path and path != self.root:
+                    self._dirty.add(os.path.dirname(path))
+
+            if self._dirty and self._timer_id is None:
+                self._timer_id = self.p.glib.timeout_add(self.debounce_ms, self._flush)
+
+        def _flush(self):
+            self._timer_id = None
+            files = self.p.cached_files.get(self.root)
+            if files is None:
+                self._dirty.clear()
+                return False
+            if self._busy:
+                # Picked up when the running update is published.
+                return False
+            dirty, self._dirty = self._dirty, set()
+            self._busy = True
+            self.p.run_in_thread(self._compute, list(files), dirty)
+            return False
+
+        def _compute(self, files, dirty):
+            dirs = prepared = None
+            try:
+                files = self.p.scanner.compute_changes(self.root, files, dirty)
+                if files is not None:
+                    dirs = self.p.scanner.watched_dirs(self.root)
+                    prepared = self.p.ui_factory.prepare_directory(self.root, files)
+            except Exception as e:
+                self.p.logger.error(f"Updating file list of {self.root} failed: {e}")
+                files = None
+            self.p.schedule_in_gtk_thread(self._publish, files, dirs, prepared)
+
+        def _publish(self, files, dirs, prepared):
+            self._busy = False
+            if self._stopped:
+                # The update may have put back a tree that was forgotten.
+                self.p.scanner.forget(self.root)
+                return False
+            cached = self.p.cached_files.get(self.root)
+            if files is not None and cached is not None:
+                cached[:] = files
+                self.sync(dirs)
+                self.p.ui_factory.refresh_directory(self.root, prepared)
+            if self._dirty and self._timer_id is None:
+                self._timer_id = self.p.glib.timeout_add(self.debounce_ms, self._flush)
+            return False
+
+        def stop(self):
+            self._stopped = True
+            if self._timer_id is not None:
+                self.p.glib.source_remove(self._timer_id)
+                self._timer_id = None
+            for monitor in self.monitors.values():
+                monitor.cancel()
+            self.monitors.clear()
+            self._dirty.clear()
+
+    return DirectoryWatcher
@@ -0,0 +1,60 @@
+"""Coalescing of high-frequency view events."""
+
+import time
+from typing import Any, Callable, Dict, Tuple
+
+
+class EventCoalescer:
+    """
+    Delays events per (view id, event) until they settle.
+
+    Every new event replaces the pending one for its key (latest wins) and
+    pushes the deadline out to window_ms after it. Instead of re-arming a
+    GLib timer for every event, one timer per key checks the deadline when
+    it fires and re-arms only for the remaining time, so a drag that emits
+    dozens of geometry events costs a dict write per event.
+    """
+
+    def __init__(self, plugin, window_ms: int, deliver: Callable[[Dict], Any]):
+        self.p = plugin
+        self.window_ms = window_ms
+        self.deliver = deliver
+        # key -> [latest data, deadline, timer id]
+        self._pending: Dict[Tuple[Any, str], list] = {}
+
+    def push(self, view_id, event: str, data: Dict):
+        key = (view_id, event)
+        deadline = time.monotonic() + self.window_ms / 1000
+        entry = self._pending.get(key)
+        if entry is not None:
+            entry[0], entry[1] = data, deadline
+            return
+        timer_id = self.p.glib.timeout_add(self.window_ms, self._on_timeout, key)
+        self._pending[key] = [data, deadline, timer_id]
+
+    def _on_timeout(self, key):
+        entry = self._pending.get(key)
+        if entry is None:
+            return False
+        remaining = entry[1] - time.monotonic()
+        if remaining > 0.001:
+            entry[2] = self.p.glib.timeout_add(
+                max(1, int(remaining * 1000)), self._on_timeout, key
+            )
+            return False
+        del self._pending[key]
+        try:
+            self.deliver(entry[0])
+        except Exception as e:
+            self.p.logger.error(f"Coalesced {key[1]} failed: {e}")
+        return False
+
+    def drop_view(self, view_id):
+        """Forget pending events of a view that went away."""
+        for key in [k for k in self._pending if k[0] == view_id]:
+            self.p.glib.source_remove(self._pending.pop(key)[2])
+
+    def clear(self):
+        for entry in self._pending.values():
+            self.p.glib.source_remove(entry[2])
+        self._pending.clear()
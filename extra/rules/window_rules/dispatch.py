@@ -0,0 +1,99 @@
+"""Event-indexed dispatch table for window rules."""
+
+import json
+from typing import Any, Dict, List, Set, Tuple
+
+from .matchers import ViewValues
+
+# Match keys whose view values vary too much to memoize per value.
+UNBOUNDED_KEYS = {"title"}
+
+# Memoized (event, key, value) lookups; reset when it grows past this.
+MAX_MEMO_ENTRIES = 4096
+
+
+def rules_fingerprint(rules: List[Dict]) -> str:
+    """Stable text form of a rule list, used to detect config changes."""
+    return json.dumps(rules, sort_keys=True, default=str)
+
+
+class _EventBucket:
+    __slots__ = ("exact", "memoized", "linear")
+
+    def __init__(self):
+        # key -> lowercase literal -> rule indexes
+        self.exact: Dict[str, Dict[str, List[int]]] = {}
+        # key -> indexes of single-condition rules evaluated once per value
+        self.memoized: Dict[str, List[int]] = {}
+        # indexes tested on every event
+        self.linear: List[int] = []
+
+
+class RuleTable:
+    """
+    Compiled rules indexed by event.
+
+    Within an event, rules with an exact condition live in a hash map keyed
+    by that literal (multi-condition rules are verified after the hit).
+    Single-condition rules on keys with few distinct view values (app-id,
+    role, output-name, ...) are evaluated once per value and memoized, so
+    looking up an app-id is a dict hit after the first window of that app.
+    Only title and free-form multi-condition rules are tested on each event.
+    A lookup therefore costs O(matching rules) rather than O(all rules).
+    """
+
+    def __init__(self, engine, rules: List[Dict]):
+        self.rules = list(rules)
+        self.fingerprint = rules_fingerprint(self.rules)
+        self.compiled = [engine.compile(rule) for rule in self.rules]
+        self._events: Dict[str, _EventBucket] = {}
+        self._verify: Set[int] = set()
+        self._memo: Dict[Tuple[str, str, str], List[int]] = {}
+
+        for idx, cr in enumerate(self.compiled):
+            if not cr.conditions:
+                continue
+            bucket = self._events.setdefault(cr.rule.get("event"), _EventBucket())
+            exact = None
+            if not cr.any_of:
+                exact = next((c for c in cr.conditions if c.literal is not None), None)
+            if exact is not None:
+                keyed = bucket.exact.setdefault(exact.key, {})
+                keyed.setdefault(exact.literal, []).append(idx)
+                if len(cr.conditions) > 1:
+                    self._verify.add(idx)
+            elif len(cr.conditions) == 1 and cr.conditions[0].key not in UNBOUNDED_KEYS:
+                bucket.memoized.setdefault(cr.conditions[0].key, []).append(idx)
+            else:
+                bucket.linear.append(idx)
+
+    def handles(self, event: str) -> bool:
+        return event in self._events
+
+    def lookup(self, event: str, view: Dict[str, Any]) -> List[Dict]:
+        """Return the rules for event that match view, in config order."""
+        bucket = self._events.get(event)
+        if bucket is None:
+            return []
+
+        values = ViewValues(view)
+        compiled = self.compiled
+        hits: List[int] = []
+        for key, literals in bucket.exact.items():
+            for idx in literals.get(values.lower(key), ()):
+                if idx not in self._verify or compiled[idx].matches(values):
+                    hits.append(idx)
+
+        for key, indexes in bucket.memoized.items():
+            memo_key = (event, key, values.lower(key))
+            found = self._memo.get(memo_key)
+            if found is None:
+                if len(self._memo) >= MAX_MEMO_ENTRIES:
+                    self._memo.clear()
+                found = [i for i in indexes if compiled[i].matches(values)]
+                self._memo[memo_key] = found
+            hits.extend(found)
+
+        hits.extend(i for i in bucket.linear if compiled[i].matches(values))
+        hits.sort()
+        return [self.rules[i] for i in hits]
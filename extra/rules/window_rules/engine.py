@@ -1,11 +1,63 @@
 """Window Rules matching and execution engine."""
 
-from typing import Any, Dict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .matchers import CompiledRule, ViewValues
+
+_MISSING = object()
+
+# Remembered view states that each event may have changed behind our back.
+STATE_EVENTS = {
+    "view-fullscreen": ("fullscreen",),
+    "view-minimized": ("minimized",),
+    "view-tiled": ("maximized", "slot", "geometry"),
+    "view-geometry-changed": ("maximized", "slot", "geometry"),
+    "view-workspace-changed": ("workspace",),
+    "view-wset-changed": ("workspace", "output-name"),
+    "view-set-output": ("workspace", "output-name"),
+}
+
+# Execution order of actions planned for one event: where the view lives,
+# then its geometry and look, then focus, and input injection last.
+ACTION_ORDER = {
+    name: rank
+    for rank, name in enumerate(
+        [
+            "move_to_output",
+            "send_to_workspace",
+            "set_minimized",
+            "maximize",
+            "fullscreen",
+            "configure_view",
+            "assign_slot",
+            "center",
+            "alpha",
+            "set_focus",
+            "center_cursor",
+            "move_cursor",
+            "press_key",
+            "click_button",
+        ]
+    )
+}
+
+
+class PlannedAction(NamedTuple):
+    action: str
+    v_id: Any
+    value: Any
+    app_id: Any
+    # (state, value) the action leaves the view in, if tracked
+    target: Optional[Tuple[str, Any]]
 
 
 class RuleEngine:
     def __init__(self, plugin):
         self.p = plugin
+        # Per view id: state -> value this engine applied last
+        self._applied: Dict[Any, Dict[str, Any]] = {}
+        # Per view id: keys of "once" rules that already fired
+        self._fired: Dict[Any, set] = {}
         # Action Registry mapping action strings to internal methods
         self._actions = {
             "fullscreen": self._act_fullscreen,
@@ -24,30 +76,37 @@ class RuleEngine:
             "set_focus": self._act_set_focus,
         }
 
+    def compile(self, rule: Dict) -> CompiledRule:
+        """Compile a rule's conditions into matcher objects."""
+        return CompiledRule(rule, getattr(self.p, "logger", None))
+
     def match(self, rule: Dict, view: Dict) -> bool:
         """Determines if a view matches a specific rule."""
-        m_key = rule.get("match_key")
-        m_val = str(rule.get("match_value", ""))
-        view_val = view.get(m_key)
-
-        if m_key == "parent":
-            is_child = int(view_val) > -1
-            if m_val == "Dialog or Popup":
-                return is_child
-            if m_val == "Main Window":
-                return not is_child
-            return False
-
-        if m_key in ["title", "app-id"]:
-            return m_val.lower() in str(view_val).lower()
-
-        return m_val.lower() == str(view_val).lower()
+        return self.compile(rule).matches(ViewValues(view))
 
     def apply(self, rule: Dict, view: Dict):
         """Executes the action defined in the rule via the registry."""
+        self.execute(self.plan([(rule, view)]))
+
+    def plan(self, matches: List[Tuple[Dict, Dict]]) -> List[PlannedAction]:
+        """
+        Turn matched (rule, view) pairs into the actions that still need to
+        run, ordered by ACTION_ORDER (stable for equal ranks). The expected
+        state is recorded here, so a later event sees it even before the
+        pipeline got to the call.
+        """
+        planned = []
+        for rule, view in matches:
+            item = self._plan_one(rule, view)
+            if item is not None:
+                planned.append(item)
+        planned.sort(key=lambda a: ACTION_ORDER.get(a.action, len(ACTION_ORDER)))
+        return planned
+
+    def _plan_one(self, rule: Dict, view: Dict) -> Optional[PlannedAction]:
         v_id = view.get("id")
         if not v_id:
-            return
+            return None
 
         action = rule.get("action")
         val = rule.get("value")
@@ -59,17 +118,107 @@ class RuleEngine:
             "set_minimized",
             "configure_view",
         ]:
-            return
+            return None
+
+        if action not in self._actions:
+            return None
+
+        if rule.get("once"):
+            once_key = self._rule_key(rule)
+            fired = self._fired.setdefault(v_id, set())
+            if once_key in fired:
+                return None
+            fired.add(once_key)
 
-        handler = self._actions.get(action)
-        if handler:
+        target = self._target_state(action, val)
+        if target:
+            if self._in_state(v_id, view, *target):
+                return None
+            self._applied.setdefault(v_id, {})[target[0]] = target[1]
+        return PlannedAction(action, v_id, val, view.get("app-id"), target)
+
+    def execute(self, actions: List[PlannedAction]):
+        """Run planned actions in order. Must run on the GTK thread."""
+        for item in actions:
             try:
                 self.p.logger.info(
-                    f"[Rule Triggered] View: {view.get('app-id')} Action: {action}"
+                    f"[Rule Triggered] View: {item.app_id} Action: {item.action}"
                 )
-                handler(v_id, val)
+                self._actions[item.action](item.v_id, item.value)
             except Exception as e:
-                self.p.logger.error(f"Failed to execute action {action}: {e}")
+                self.p.logger.error(f"Failed to execute action {item.action}: {e}")
+                if item.target:
+                    self._forget_state(item.v_id, *item.target)
+
+    # Applied-state tracking
+    #
+    @staticmethod
+    def _rule_key(rule: Dict):
+        return (
+            rule.get("name"),
+            rule.get("event"),
+            rule.get("match_key"),
+            str(rule.get("match_value")),
+            rule.get("action"),
+            str(rule.get("value")),
+        )
+
+    @staticmethod
+    def _target_state(action, val) -> Optional[Tuple[str, Any]]:
+        """The (state, value) an action leaves a view in, if it is idempotent."""
+        try:
+            if action == "fullscreen":
+                return "fullscreen", str(val).lower() == "true"
+            if action == "set_minimized":
+                return "minimized", str(val).lower() == "true"
+            if action == "maximize":
+                return "maximized", True
+            if action == "alpha":
+                return "alpha", float(val)
+            if action == "send_to_workspace":
+                return "workspace", str(val).replace(" ", "")
+            if action == "move_to_output":
+                return "output-name", str(val)
+            if action == "configure_view":
+                return "geometry", tuple(map(int, str(val).split(",")))
+            if action == "assign_slot":
+                from .template import SLOT_MAP
+
+                return "slot", SLOT_MAP.get(val, val)
+        except (TypeError, ValueError):
+            pass
+        return None
+
+    def _in_state(self, v_id, view: Dict, state: str, value) -> bool:
+        """
+        True if the view is known to be in the target state: from the view
+        data itself where the compositor reports it, else from what this
+        engine applied last.
+        """
+        if state in ("fullscreen", "minimized", "output-name") and state in view:
+            return view[state] == value
+        if state == "geometry" and isinstance(view.get("geometry"), dict):
+            g = view["geometry"]
+            return (g.get("x"), g.get("y"), g.get("width"), g.get("height")) == value
+        return self._applied.get(v_id, {}).get(state, _MISSING) == value
+
+    def _forget_state(self, v_id, state: str, value):
+        applied = self._applied.get(v_id)
+        if applied and applied.get(state, _MISSING) == value:
+            del applied[state]
+
+    def observe(self, event: str, view: Dict):
+        """Invalidate remembered state that an event may have changed."""
+        v_id = view.get("id")
+        if event == "view-unmapped":
+            self._applied.pop(v_id, None)
+            self._fired.pop(v_id, None)
+            return
+        states = STATE_EVENTS.get(event)
+        applied = self._applied.get(v_id)
+        if states and applied:
+            for state in states:
+                applied.pop(state, None)
 
     # Dedicated Action Methods
     #
@@ -2,6 +2,7 @@
 
 from .template import (
     MATCH_KEYS,
+    EDITOR_FIELDS,
     EVENT_LIST,
     ACTION_LIST,
     ROLES,
@@ -288,6 +289,12 @@ class RuleManager:
             lambda d, _: update_action_value_widget(d.get_selected_item().get_string()),
         )
 
+        # Fields the editor has no widgets for (extra conditions, match
+        # modes) are carried over unchanged when the rules are saved.
+        row_container.extra_fields = {
+            k: v for k, v in (data or {}).items() if k not in EDITOR_FIELDS
+        }
+
         if data:
             name_entry.set_text(data.get("name", ""))
             desc_entry.set_text(data.get("description", ""))
@@ -353,6 +360,7 @@ class RuleManager:
 
             rules.append(
                 {
+                    **getattr(child.get_child(), "extra_fields", {}),
                     "name": self._get_val(ws[0]),
                     "description": self._get_val(ws[1]),
                     "match_key": ws[2].get_selected_item().get_string(),
@@ -366,6 +374,7 @@ class RuleManager:
             child = child.get_next_sibling()
 
         self.p.set_plugin_setting("rules", rules[::-1])
+        self.p.reload_rules()
         self._show_toast("Window Rules Saved Successfully")
 
     def _get_val(self, widget):
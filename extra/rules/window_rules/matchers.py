@@ -0,0 +1,190 @@
+"""Compiled matchers for window rule conditions."""
+
+import fnmatch
+import re
+from typing import Any, Dict, List, Optional
+
+# A match_value may carry its mode as a prefix, e.g. "re:^firefox$".
+MODE_PREFIXES = {
+    "re:": "regex",
+    "regex:": "regex",
+    "glob:": "glob",
+    "exact:": "exact",
+    "contains:": "contains",
+}
+
+# Keys matched by substring unless a mode says otherwise.
+SUBSTRING_KEYS = {"title", "app-id"}
+
+
+class ViewValues:
+    """Lowercase string forms of a view's fields, computed once per event."""
+
+    __slots__ = ("view", "_lower")
+
+    def __init__(self, view: Dict[str, Any]):
+        self.view = view
+        self._lower: Dict[str, str] = {}
+
+    def raw(self, key: str) -> Any:
+        return self.view.get(key)
+
+    def lower(self, key: str) -> str:
+        value = self._lower.get(key)
+        if value is None:
+            value = self._lower[key] = str(self.view.get(key)).lower()
+        return value
+
+
+class ExactMatcher:
+    __slots__ = ("literal",)
+
+    def __init__(self, literal: str):
+        self.literal = literal.lower()
+
+    def test(self, values: ViewValues, key: str) -> bool:
+        return values.lower(key) == self.literal
+
+
+class ContainsMatcher:
+    __slots__ = ("literal",)
+
+    def __init__(self, literal: str):
+        self.literal = literal.lower()
+
+    def test(self, values: ViewValues, key: str) -> bool:
+        return self.literal in values.lower(key)
+
+
+class RegexMatcher:
+    __slots__ = ("regex",)
+
+    def __init__(self, pattern: str):
+        self.regex = re.compile(pattern, re.IGNORECASE)
+
+    def test(self, values: ViewValues, key: str) -> bool:
+        return self.regex.search(str(values.raw(key))) is not None
+
+
+class GlobMatcher:
+    __slots__ = ("regex",)
+
+    def __init__(self, pattern: str):
+        self.regex = re.compile(fnmatch.translate(pattern.lower()))
+
+    def test(self, values: ViewValues, key: str) -> bool:
+        return self.regex.match(values.lower(key)) is not None
+
+
+class ParentMatcher:
+    __slots__ = ("wants_child",)
+
+    def __init__(self, value: str):
+        self.wants_child = {"Dialog or Popup": True, "Main Window": False}.get(value)
+
+    def test(self, values: ViewValues, key: str) -> bool:
+        if self.wants_child is None:
+            return False
+        try:
+            return (int(values.raw(key)) > -1) == self.wants_child
+        except (TypeError, ValueError):
+            return False
+
+
+class NeverMatcher:
+    """Stands in for a condition that failed to compile."""
+
+    __slots__ = ()
+
+    def test(self, values: ViewValues, key: str) -> bool:
+        return False
+
+
+def split_mode(value: str, mode: Optional[str] = None):
+    """Return (mode, value), honoring a mode prefix on the value."""
+    if not mode:
+        for prefix, prefixed_mode in MODE_PREFIXES.items():
+            if value.startswith(prefix):
+                return prefixed_mode, value[len(prefix) :]
+    return mode, value
+
+
+class Condition:
+    """One key/value test of a rule, compiled once."""
+
+    __slots__ = ("key", "mode", "literal", "matcher")
+
+    def __init__(self, key: str, value: Any, mode: Optional[str] = None, logger=None):
+        self.key = key
+        mode, value = split_mode(str(value if value is not None else ""), mode)
+        if key == "parent":
+            mode = "parent"
+        elif not mode:
+            if key in SUBSTRING_KEYS:
+                # Saved titles such as "Save changes?" are literal text.
+                mode = "contains"
+                if logger and any(c in value for c in "*?"):
+                    logger.info(
+                        f"Window rule {key}={value!r} is matched as text; "
+                        f"prefix it with 'glob:' for a wildcard pattern."
+                    )
+            else:
+                mode = "exact"
+        self.mode = mode
+        self.literal = value.lower() if mode == "exact" else None
+
+        try:
+            if mode == "parent":
+                self.matcher = ParentMatcher(value)
+            elif mode == "exact":
+                self.matcher = ExactMatcher(value)
+            elif mode == "contains":
+                self.matcher = ContainsMatcher(value)
+            elif mode == "glob":
+                self.matcher = GlobMatcher(value)
+            elif mode == "regex":
+                self.matcher = RegexMatcher(value)
+            else:
+                raise ValueError(f"unknown match mode {mode!r}")
+        except (re.error, ValueError) as e:
+            if logger:
+                logger.warning(f"Window rule condition {key}={value!r} disabled: {e}")
+            self.matcher = NeverMatcher()
+
+    def test(self, values: ViewValues) -> bool:
+        return self.matcher.test(values, self.key)
+
+
+class CompiledRule:
+    """
+    A rule with its conditions compiled. The classic match_key/match_value
+    pair is the first condition; a rule may add more under "conditions",
+    combined with "all" (default) or "any" as set in "combine".
+    """
+
+    __slots__ = ("rule", "conditions", "any_of")
+
+    def __init__(self, rule: Dict, logger=None):
+        self.rule = rule
+        self.conditions: List[Condition] = []
+        if rule.get("match_key"):
+            self.conditions.append(
+                Condition(
+                    rule["match_key"],
+                    rule.get("match_value", ""),
+                    rule.get("match_mode"),
+                    logger,
+                )
+            )
+        for cond in rule.get("conditions") or []:
+            self.conditions.append(
+                Condition(cond.get("key"), cond.get("value"), cond.get("mode"), logger)
+            )
+        self.any_of = str(rule.get("combine", "all")).lower() == "any"
+
+    def matches(self, values: ViewValues) -> bool:
+        if not self.conditions:
+            return False
+        if self.any_of:
+            return any(c.test(values) for c in self.conditions)
+        return all(c.test(values) for c in self.conditions)
@@ -0,0 +1,46 @@
+"""Deferred execution of window rule actions."""
+
+from collections import deque
+from typing import List
+
+from .engine import PlannedAction
+
+
+class ActionPipeline:
+    """
+    Runs batches of planned actions from GLib idle callbacks, one batch
+    per callback, so the event handler returns right away and a burst of
+    events does not hold the main loop for all of its IPC round trips.
+
+    Execution stays on the GTK thread: the compositor socket is shared
+    with every other plugin and is not safe to use from a worker. Batches
+    run in submission order, so consecutive events keep their order.
+    """
+
+    def __init__(self, plugin, engine):
+        self.p = plugin
+        self.engine = engine
+        self._queue: deque = deque()
+        self._idle_id = None
+
+    def submit(self, actions: List[PlannedAction]):
+        if not actions:
+            return
+        self._queue.append(actions)
+        if self._idle_id is None:
+            self._idle_id = self.p.glib.idle_add(self._run_next)
+
+    def _run_next(self):
+        if self._queue:
+            self.engine.execute(self._queue.popleft())
+        if self._queue:
+            return self.p.glib.SOURCE_CONTINUE
+        self._idle_id = None
+        return self.p.glib.SOURCE_REMOVE
+
+    def clear(self):
+        """Drop batches that have not run yet."""
+        self._queue.clear()
+        if self._idle_id is not None:
+            self.p.glib.source_remove(self._idle_id)
+            self._idle_id = None
@@ -13,6 +13,18 @@ METADATA = {
 
 MATCH_KEYS = ["app-id", "title", "output-name", "type", "role", "parent"]
 
+# Rule fields edited through the Rule Manager widgets.
+EDITOR_FIELDS = [
+    "name",
+    "description",
+    "match_key",
+    "match_value",
+    "event",
+    "timeout",
+    "action",
+    "value",
+]
+
 EVENT_LIST = [
     "view-mapped",
     "view-focused",
@@ -10,6 +10,9 @@ def get_plugin_metadata(_):
 def get_plugin_class():
     from src.plugins.core._base import BasePlugin
     from .engine import RuleEngine
+    from .dispatch import RuleTable, rules_fingerprint
+    from .coalesce import EventCoalescer
+    from .pipeline import ActionPipeline
     from .manager import RuleManager
     from .template import EVENT_LIST
 
@@ -18,6 +21,14 @@ def get_plugin_class():
             super().__init__(panel_instance)
             self.engine = RuleEngine(self)
             self.manager = RuleManager(self)
+            self.table = RuleTable(self.engine, [])
+            self.coalescer = EventCoalescer(self, 150, self._dispatch)
+            self.pipeline = ActionPipeline(self, self.engine)
+            self.coalesced_events = set()
+            self._rules_poll_id = None
+            # The rules list last compiled; a different object means the
+            # config was reloaded or saved and may need recompiling.
+            self._seen_rules = None
 
         def on_start(self):
             # Register CSS for the rule manager UI
@@ -28,9 +39,54 @@ def get_plugin_class():
                 "rules", [], "List of fuzzy-logic window rules."
             )
 
+            self.get_plugin_setting_add_hint(
+                "coalesce_ms",
+                150,
+                "Quiet time (ms) a high-frequency event must settle for before "
+                "its rules run. 0 disables coalescing.",
+            )
+            self.get_plugin_setting_add_hint(
+                "coalesce_events",
+                ["view-geometry-changed", "view-title-changed"],
+                "Events whose rules run once per settled state, latest wins.",
+            )
+            self._load_coalesce_settings()
+            self.reload_rules()
+            # Hand edits of the config file are picked up without touching
+            # the config from the event path.
+            self._rules_poll_id = self.glib.timeout_add_seconds(
+                3, self._check_rules_changed
+            )
+
             # Delayed subscription to event manager
             self.glib.timeout_add(500, self._subscribe)
 
+        def _load_coalesce_settings(self):
+            self.coalescer.window_ms = max(
+                0, int(self.get_plugin_setting("coalesce_ms", 150))
+            )
+            self.coalesced_events = set(
+                self.get_plugin_setting(
+                    "coalesce_events", ["view-geometry-changed", "view-title-changed"]
+                )
+            )
+
+        def reload_rules(self):
+            """Recompile the dispatch table from the current configuration."""
+            self._seen_rules = self.get_plugin_setting("rules", [])
+            self.table = RuleTable(self.engine, self._seen_rules)
+
+        def _check_rules_changed(self):
+            rules = self.get_plugin_setting("rules", [])
+            # Only a new settings object can hold new rules; the fingerprint
+            # then tells a real change from a reload of the same rules.
+            if rules is not self._seen_rules:
+                self._seen_rules = rules
+                if rules_fingerprint(rules) != self.table.fingerprint:
+                    self.table = RuleTable(self.engine, rules)
+                self._load_coalesce_settings()
+            return self.glib.SOURCE_CONTINUE
+
         def _subscribe(self):
             mgr = self.plugins.get("org.waypanel.plugin.event_manager")
             if not mgr:
@@ -46,20 +102,41 @@ def get_plugin_class():
             view, ev = data.get("view"), data.get("event")
             if not view:
                 return
+            self.engine.observe(ev, view)
+            if ev == "view-unmapped":
+                self.coalescer.drop_view(view.get("id"))
+            if not self.table.handles(ev):
+                return
 
             if view["type"] != "toplevel":
                 return
 
+            if ev in self.coalesced_events and self.coalescer.window_ms > 0:
+                self.coalescer.push(view.get("id"), ev, data)
+                return
+            self._dispatch(data)
+
+        def _dispatch(self, data):
+            view, ev = data["view"], data["event"]
             # Apply rules defined in the Rule Manager
-            for rule in self.get_plugin_setting("rules", []):
-                if rule.get("event") == ev and self.engine.match(rule, view):
-                    t = rule.get("timeout", 0)
-                    if t > 0:
-                        self.glib.timeout_add(
-                            t,
-                            lambda r=rule, v=view: (self.engine.apply(r, v), False)[1],
-                        )
-                    else:
-                        self.engine.apply(rule, view)
+            now = []
+            for rule in self.table.lookup(ev, view):
+                t = rule.get("timeout", 0)
+                if t > 0:
+                    self.glib.timeout_add(t, self._run_delayed, rule, view)
+                else:
+                    now.append((rule, view))
+            self.pipeline.submit(self.engine.plan(now))
+
+        def _run_delayed(self, rule, view):
+            self.pipeline.submit(self.engine.plan([(rule, view)]))
+            return False
+
+        def on_stop(self):
+            if self._rules_poll_id is not None:
+                self.glib.source_remove(self._rules_poll_id)
+                self._rules_poll_id = None
+            self.coalescer.clear()
+            self.pipeline.clear()
 
     return WindowRulesPlugin
@@ -0,0 +1,266 @@
+"""
+Headless benchmark for the File Content Searcher scanning strategies.
+
+Generates a synthetic source tree and runs every scanning mode against it
+without GTK or a compositor, printing one JSON report. The plugin is
+imported as the grep package, so extra/ has to be on the import path:
+
+    PYTHONPATH=extra python tools/grep_benchmark.py --files 20000
+
+Reported per mode: files/sec and MB/sec of a full scan, p50/p99 query
+latency over the query set, and the peak RSS of that mode alone (each mode
+runs in a fresh process, its pool workers included). Numbers are taken
+with a warm page cache; drop caches externally for cold-cache figures.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from grep.filters import SourceFilter
+from grep.index import TrigramIndex, index_path_for_root
+from grep.matcher import Query
+from grep.search import ScanEngine, SearchJob
+
+EXTENSIONS = {".py": "python", ".c": "c", ".h": "cpp", ".js": "javascript"}
+VOCABULARY = [
+    "self",
+    "return",
+    "import",
+    "value",
+    "buffer",
+    "config",
+    "handler",
+    "widget",
+    "index",
+    "result",
+    "static",
+    "const",
+    "struct",
+    "void",
+    "while",
+    "for",
+    "if",
+    "else",
+]
+NEEDLE = "BENCH_NEEDLE"
+
+
+def generate_tree(root, files, mean_kb, match_density, fanout, seed):
+    """
+    Write a synthetic tree and return {path: size}.
+
+    File sizes follow a log-normal distribution around mean_kb; a
+    match_density fraction of files contains the needle on a random line.
+    """
+    rng = random.Random(seed)
+    sizes = {}
+    exts = list(EXTENSIONS)
+    for i in range(files):
+        parts = []
+        n = i
+        for _ in range(3):
+            parts.append(f"d{n % fanout}")
+            n //= fanout
+        directory = os.path.join(root, *parts)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"f{i}{exts[i % len(exts)]}")
+
+        target = max(64, int(rng.lognormvariate(0, 0.8) * mean_kb * 1024))
+        lines = []
+        written = 0
+        while written < target:
+            line = " ".join(rng.choices(VOCABULARY, k=10))
+            lines.append(line)
+            written += len(line) + 1
+        if rng.random() < match_density:
+            lines.insert(rng.randrange(len(lines)), f"{NEEDLE}_{i % 97}_hit = 1")
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(data)
+        sizes[path] = len(data)
+    return sizes
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    k = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def peak_rss_kb():
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children)
+
+
+def run_mode(name, root, queries, total_bytes, source_filter, engine, index, repeat):
+    """Run every query repeat times and return the mode's metrics."""
+    latencies = []
+    scanned = 0
+    scan_seconds = 0.0
+    matches = 0
+    for query in queries:
+        for _ in range(repeat):
+            job = SearchJob(root, query, source_filter, index)
+            start = time.perf_counter()
+            result = job.run(engine=engine)
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            scanned += job.scanned
+            scan_seconds += elapsed
+            matches = max(matches, len(result))
+    full_scans = scan_seconds / max(1, len(latencies))
+    report = {
+        "mode": name,
+        "engine": engine.mode if engine.workers > 1 else "serial",
+        "workers": engine.workers,
+        "queries": len(latencies),
+        "max_matches": matches,
+        "files_scanned": scanned,
+        "files_per_sec": round(scanned / scan_seconds, 1) if scan_seconds else None,
+        "mb_per_sec": (
+            round(total_bytes / full_scans / 1e6, 1)
+            if full_scans and index is None
+            else None
+        ),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "peak_rss_kb": peak_rss_kb(),
+    }
+    return report
+
+
+MODES = ("serial", "threads", "processes", "indexed", "regex")
+
+
+def measure_mode(mode, root, work, total_bytes, workers, repeat):
+    """Run one mode against the tree. Meant to run in its own process."""
+    source_filter = SourceFilter(EXTENSIONS, set(), max_file_bytes=1 << 30)
+    literal_queries = [Query(f"{NEEDLE}_{k}_hit".encode()) for k in (1, 13, 42)] + [
+        Query(b"handler widget")
+    ]
+    regex_queries = [Query(rb"BENCH_NEEDLE_\d+_hit", regex=True)]
+
+    index = None
+    extra = {}
+    queries = literal_queries
+    if mode == "serial":
+        engine = ScanEngine(workers=1)
+    elif mode in ("threads", "processes"):
+        engine = ScanEngine(mode=mode, workers=workers)
+    elif mode == "indexed":
+        engine = ScanEngine(workers=1)
+        index = TrigramIndex(root, index_path_for_root(work, root))
+        build_start = time.perf_counter()
+        index.sync(source_filter)
+        extra = {
+            "index_build_seconds": round(time.perf_counter() - build_start, 3),
+            "index_bytes": os.path.getsize(index.db_path),
+        }
+    else:
+        engine = ScanEngine(workers=workers)
+        queries = regex_queries
+
+    try:
+        report = run_mode(
+            mode, root, queries, total_bytes, source_filter, engine, index, repeat
+        )
+    finally:
+        engine.shutdown()
+        if index:
+            index.close()
+    report.update(extra)
+    if engine.fallback_reason:
+        report["fallback"] = engine.fallback_reason
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--mean-kb", type=float, default=8.0)
+    parser.add_argument("--match-density", type=float, default=0.01)
+    parser.add_argument("--fanout", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--modes",
+        default="serial,threads,processes,indexed,regex",
+        help="Comma separated subset of serial,threads,processes,indexed,regex.",
+    )
+    parser.add_argument(
+        "--tree", help="Create the synthetic tree here and keep it afterwards."
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    args = parser.parse_args(argv)
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"unknown mode: {mode}")
+
+    root = args.tree or tempfile.mkdtemp(prefix="grep_bench_")
+    work = tempfile.mkdtemp(prefix="grep_bench_index_")
+    try:
+        start = time.perf_counter()
+        sizes = generate_tree(
+            root, args.files, args.mean_kb, args.match_density, args.fanout, args.seed
+        )
+        generate_seconds = time.perf_counter() - start
+
+        total_bytes = sum(sizes.values())
+
+        # One fresh process per mode, so ru_maxrss is that mode's own peak
+        # rather than the maximum over every mode run before it.
+        reports = []
+        spawn = multiprocessing.get_context("spawn")
+        for mode in modes:
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as runner:
+                reports.append(
+                    runner.submit(
+                        measure_mode,
+                        mode,
+                        root,
+                        work,
+                        total_bytes,
+                        args.workers,
+                        args.repeat,
+                    ).result()
+                )
+
+        result = {
+            "tree": {
+                "files": len(sizes),
+                "bytes": sum(sizes.values()),
+                "match_density": args.match_density,
+                "generate_seconds": round(generate_seconds, 3),
+            },
+            "cpu_count": os.cpu_count(),
+            "modes": reports,
+        }
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+        if not args.tree:
+            shutil.rmtree(root, ignore_errors=True)
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())